@@ -0,0 +1,222 @@
+"""End-to-end benchmark of the agent pipeline against local fakes of Gemini and Amadeus.
+
+    python benchmarks/bench_e2e.py --queries 40 --concurrency 1 4 8 --render-mode template
+    python benchmarks/bench_e2e.py --llm-latency 0.8 --amadeus-failure-rate 0.05 --out run.json
+
+The root agent runs through a Runner headless, without Flet. Every LLM agent gets a
+FakeLlm, and AMADEUS_BASE_URL points at FakeAmadeus. Each concurrency level reports these figures:
+
+- end-to-end latency: p50, p95 and p99
+- per-stage latency: p50, p95 and p99
+- throughput
+- failures
+- backend call counts
+- peak RSS
+
+Results are written as JSON. Plan, flight and IATA caches are off unless
+--warm-caches is given, so every query exercises the backends.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+import psutil  # noqa: E402
+
+from fake_amadeus import FakeAmadeus  # noqa: E402
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        # linear interpolation between closest ranks
+        pos = (len(ordered) - 1) * q
+        low = int(pos)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+    return {
+        "p50": round(pick(0.50), 4),
+        "p95": round(pick(0.95), 4),
+        "p99": round(pick(0.99), 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class RssSampler:
+    """Peak resident set size of this process, sampled in a background thread."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = self._process.memory_info().rss
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def load_queries(path: str, count: int) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()]
+    return [queries[i % len(queries)] for i in range(count)]
+
+
+async def run_level(args, build_runner, queries: List[str], concurrency: int, amadeus: FakeAmadeus) -> Dict:
+    from http_client import async_amadeus_client
+    from pipeline import run_pipeline
+
+    runner = build_runner()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    tokens = [0, 0]
+    calls_before = dict(amadeus.calls)
+
+    async def one(query: str) -> None:
+        async with semaphore:
+            try:
+                result = await run_pipeline(
+                    runner, query, user_id="bench", session_id=uuid.uuid4().hex, stream=args.stream, discard_session=True
+                )
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            latencies.append(result.elapsed)
+            tokens[0] += result.tokens_in
+            tokens[1] += result.tokens_out
+            for stage, seconds in result.stage_seconds.items():
+                stages.setdefault(stage, []).append(seconds)
+
+    out = io.StringIO()
+    with RssSampler() as rss, contextlib.redirect_stdout(sys.stdout if args.verbose else out):
+        start = time.perf_counter()
+        await asyncio.gather(*(one(q) for q in queries))
+        wall = time.perf_counter() - start
+    # Each level runs in its own asyncio.run, so its connection pool ends with it
+    await async_amadeus_client.aclose()
+
+    return {
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "ok": len(latencies),
+        "failed": sum(errors.values()),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_qps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "e2e_s": percentiles(latencies),
+        "stages_s": {stage: percentiles(values) for stage, values in sorted(stages.items())},
+        "tokens_in": tokens[0],
+        "tokens_out": tokens[1],
+        "amadeus_calls": {k: v - calls_before.get(k, 0) for k, v in amadeus.calls.items()},
+        "peak_rss_mb": round(rss.peak / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20, help="queries per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--render-mode", default="template", choices=("chain", "single", "template"))
+    parser.add_argument("--corpus", default=os.path.join(HERE, "parser_corpus.jsonl"))
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per fake model call")
+    parser.add_argument("--llm-per-token", type=float, default=0.0, help="extra seconds per output token")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--amadeus-latency", type=float, default=0.2, help="seconds per fake Amadeus request")
+    parser.add_argument("--amadeus-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stream", action="store_true", help="run with SSE streaming like the app")
+    parser.add_argument("--warm-caches", action="store_true", help="keep plan/flight/IATA caches on")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own log lines")
+    parser.add_argument("--out", default=None, help="JSON output path (default benchmarks/results/e2e-<time>.json)")
+    args = parser.parse_args()
+
+    amadeus = FakeAmadeus(latency=args.amadeus_latency, failure_rate=args.amadeus_failure_rate, seed=args.seed)
+    os.environ["AMADEUS_BASE_URL"] = amadeus.start()
+    os.environ["TRIPWISE_IATA_DB"] = ""
+    os.environ["TRIPWISE_FLIGHT_CACHE_DB"] = ""
+    os.environ["TRIPWISE_PLAN_CACHE_DB"] = ""
+    if not args.warm_caches:
+        os.environ["TRIPWISE_PLAN_CACHE"] = "0"
+        os.environ["TRIPWISE_FLIGHT_CACHE_TTL"] = "0"
+        os.environ["TRIPWISE_IATA_SEED"] = "0"
+        os.environ["TRIPWISE_IATA_CACHE_SIZE"] = "0"
+
+    # Only now, so settings picks up the environment above.
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from agents import APP_NAME, build_root_agent
+    from amadeus_auth import token_manager
+    from fake_llm import FakeLlm
+
+    token_manager.configure("bench-client", "bench-secret")
+
+    def model() -> FakeLlm:
+        return FakeLlm(latency=args.llm_latency, per_token=args.llm_per_token, failure_rate=args.llm_failure_rate)
+
+    def build_runner() -> Runner:
+        return Runner(
+            agent=build_root_agent(args.render_mode, model_factory=model),
+            app_name=APP_NAME,
+            session_service=InMemorySessionService(),
+        )
+
+    queries = load_queries(args.corpus, args.queries)
+    levels = []
+    for concurrency in args.concurrency:
+        level = asyncio.run(run_level(args, build_runner, queries, concurrency, amadeus))
+        levels.append(level)
+        e2e = level["e2e_s"]
+        print(
+            f"concurrency {concurrency:>3}: {level['ok']}/{level['queries']} ok, {level['throughput_qps']:.2f} q/s, "
+            f"p50 {e2e.get('p50', 0):.3f}s p95 {e2e.get('p95', 0):.3f}s p99 {e2e.get('p99', 0):.3f}s, "
+            f"peak RSS {level['peak_rss_mb']} MB"
+        )
+    amadeus.stop()
+
+    report = {
+        "benchmark": "e2e",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "verbose")},
+        "levels": levels,
+        "peak_rss_mb": max(level["peak_rss_mb"] for level in levels) if levels else 0.0,
+    }
+    out = args.out or os.path.join(HERE, "results", f"e2e-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
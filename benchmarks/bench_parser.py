@@ -0,0 +1,91 @@
+"""Accuracy and throughput of the local trip-details parser over a labelled corpus.
+
+    python benchmarks/bench_parser.py [--corpus benchmarks/parser_corpus.jsonl] [--repeat 200]
+
+Each corpus line is {"query": ..., "expected": {...}} or {"query": ..., "expected": null}
+for queries that should be left to the CoordinatorAgent LLM. Reported:
+
+- local_rate: share of queries answered locally (LLM call avoided)
+- field_accuracy: per field, share of locally answered queries with the expected value
+- false_confident: locally answered queries that were wrong or should have gone to the LLM
+- missed: queries with expected details that still fell back to the LLM
+- queries_per_s: parse throughput
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import settings  # noqa: E402
+from trip_parser import parse_trip_query  # noqa: E402
+
+FIELDS = ("origin", "destination", "days_of_stay", "departure_date", "return_date", "budget")
+
+
+def _same(field, got, want) -> bool:
+    if field in ("origin", "destination"):
+        return str(got or "").casefold() == str(want or "").casefold()
+    if field == "budget":
+        return (got is None and want is None) or (got is not None and want is not None and float(got) == float(want))
+    return got == want
+
+
+def main() -> None:
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=os.path.join(here, "parser_corpus.jsonl"))
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus for the throughput figure")
+    parser.add_argument("--min-confidence", type=float, default=settings.LOCAL_PARSER_MIN_CONFIDENCE)
+    parser.add_argument("--today", default="2026-01-01", help="reference date for queries without a year")
+    parser.add_argument("--verbose", action="store_true", help="print every wrong or missed query")
+    args = parser.parse_args()
+
+    today = date.fromisoformat(args.today)
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    local = false_confident = missed = 0
+    correct = dict.fromkeys(FIELDS, 0)
+    for case in corpus:
+        details, confidence = parse_trip_query(case["query"], today=today)
+        expected = case["expected"]
+        if confidence < args.min_confidence:
+            if expected is not None:
+                missed += 1
+                if args.verbose:
+                    print(f"missed ({confidence}): {case['query']}\n  got {details}")
+            continue
+
+        local += 1
+        wrong = [f for f in FIELDS if expected is None or not _same(f, details[f], expected[f])]
+        for f in FIELDS:
+            correct[f] += f not in wrong
+        if wrong:
+            false_confident += 1
+            if args.verbose:
+                print(f"wrong {wrong} ({confidence}): {case['query']}\n  got {details}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for case in corpus:
+            parse_trip_query(case["query"], today=today)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "queries": len(corpus),
+        "min_confidence": args.min_confidence,
+        "local_rate": round(local / len(corpus), 3),
+        "field_accuracy": {f: round(n / local, 3) if local else 0.0 for f, n in correct.items()},
+        "false_confident": false_confident,
+        "missed": missed,
+        "queries_per_s": round(args.repeat * len(corpus) / elapsed),
+        "us_per_query": round(elapsed / (args.repeat * len(corpus)) * 1e6, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
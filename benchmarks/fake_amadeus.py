@@ -0,0 +1,141 @@
+"""Local stand-in for the Amadeus test API: OAuth token, city search and flight offers.
+
+Each request sleeps `latency` seconds (plus up to `jitter`) and fails with a 503
+with probability `failure_rate`, so retries and timeouts show up in the numbers.
+`fail_next` scripts exact failures (a 503 with Retry-After, a 401) for tests.
+"""
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+CARRIERS = ("AI", "6E", "UK", "SG", "EK", "QR")
+
+
+def _offer(rng: random.Random, origin: str, destination: str, departure: str, adults: int) -> Dict:
+    day = date.fromisoformat(departure)
+    stops = rng.choice((0, 0, 1, 1, 2))
+    hours = 2 + stops * 2 + rng.randint(0, 3)
+    segments = []
+    at = time.mktime(day.timetuple()) + rng.randint(5, 20) * 3600
+    hops = [origin] + ["BOM", "DXB"][:stops] + [destination]
+    for a, b in zip(hops, hops[1:]):
+        end = at + hours * 3600 / len(hops[1:])
+        segments.append({
+            "carrierCode": rng.choice(CARRIERS),
+            "departure": {"iataCode": a, "at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(at))},
+            "arrival": {"iataCode": b, "at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(end))},
+        })
+        at = end + 3600
+    itinerary = {"duration": f"PT{hours}H{rng.choice((0, 15, 30, 45))}M", "segments": segments}
+    back = dict(itinerary, segments=[
+        dict(s, departure=dict(s["arrival"]), arrival=dict(s["departure"])) for s in reversed(segments)
+    ])
+    price = rng.randint(3000, 15000) * adults
+    return {
+        "type": "flight-offer",
+        "price": {"currency": "INR", "total": f"{price:.2f}"},
+        "itineraries": [itinerary, back],
+        "numberOfBookableSeats": rng.randint(1, 9),
+    }
+
+
+class FakeAmadeus:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, failure_rate: float = 0.0, offers: int = 10, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.offers = offers
+        self.rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self.failures = 0
+        self.tokens_issued = 0
+        self.authorizations: Dict[str, List[str]] = {}  # path -> Authorization headers seen
+        self._scripted: Dict[str, List[Tuple[int, Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def fail_next(self, path: str, status: int, times: int = 1, headers: Optional[Dict[str, str]] = None) -> None:
+        """Answer the next `times` requests to `path` ("token" for the OAuth endpoint) with `status`."""
+        with self._lock:
+            self._scripted.setdefault(path, []).extend([(status, dict(headers or {}))] * times)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, code: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _enter(self, path: str) -> bool:
+                with fake._lock:
+                    fake.calls[path] = fake.calls.get(path, 0) + 1
+                    fake.authorizations.setdefault(path, []).append(self.headers.get("Authorization", ""))
+                    scripted = fake._scripted.get(path)
+                    if scripted:
+                        status, headers = scripted.pop(0)
+                    else:
+                        status, headers = (503 if fake.rng.random() < fake.failure_rate else 200), {}
+                    delay = fake.latency + fake.rng.random() * fake.jitter
+                    fake.failures += status != 200
+                time.sleep(delay)
+                if status != 200:
+                    self._send(status, {"errors": [{"status": status, "title": "SERVICE UNAVAILABLE" if status == 503 else "FAILED"}]}, headers)
+                return status == 200
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self._enter("token"):
+                    with fake._lock:
+                        fake.tokens_issued += 1
+                        token = f"fake-token-{fake.tokens_issued}"
+                    self._send(200, {"access_token": token, "token_type": "Bearer", "expires_in": 1799})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if not self._enter(url.path):
+                    return
+                if url.path.endswith("/locations"):
+                    keyword = query.get("keyword", "XXX")
+                    return self._send(200, {"data": [{"subType": "CITY", "iataCode": keyword[:3].upper(), "name": keyword.upper()}]})
+                if url.path.endswith("/flight-offers"):
+                    with fake._lock:
+                        rng = random.Random(fake.rng.random())
+                    adults = int(query.get("adults", 1))
+                    return self._send(200, {"data": [
+                        _offer(rng, query["originLocationCode"], query["destinationLocationCode"], query["departureDate"], adults)
+                        for _ in range(fake.offers)
+                    ]})
+                self._send(404, {"errors": [{"status": 404, "title": "NOT FOUND"}]})
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
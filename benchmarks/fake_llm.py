@@ -0,0 +1,124 @@
+"""Fake Gemini model for the benchmarks: plausible output for each TripWise agent, no network.
+
+It recognises the agent from its instruction, calls the flight tools like the real
+FlightAgent does, streams its text in chunks when asked to, reports token usage,
+and waits `latency` seconds (plus `per_token` per output token) before answering.
+With probability `failure_rate` a call raises, like a 503 from the Gemini API.
+"""
+import asyncio
+import json
+import random
+import re
+from typing import AsyncGenerator
+
+from google.genai import types
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from trip_parser import parse_trip_query
+
+
+class FakeLlmError(RuntimeError):
+    """Injected model failure."""
+
+
+def _trip_details(request: LlmRequest) -> dict:
+    text = str(request.config.system_instruction or "")
+    match = re.search(r"\{[^{}]*\"destination\"[^{}]*\}", text)
+    try:
+        return json.loads(match.group(0)) if match else {}
+    except ValueError:
+        return {}
+
+
+def _user_text(request: LlmRequest) -> str:
+    for content in request.contents or []:
+        if content.role == "user":
+            return "".join(p.text or "" for p in content.parts or [])
+    return ""
+
+
+def _plan_markdown(details: dict) -> str:
+    days = int(details.get("days_of_stay") or 3)
+    rows = "\n".join(f"| {d} | Old town walk | Local market | Sunset by the water |" for d in range(1, days + 1))
+    return (
+        f"# Your trip to {details.get('destination', 'your destination')}\n\n"
+        "## Flight\n- Cheapest option found: **INR 4500**, nonstop\n\n"
+        f"## Daily plan\n| Day | Morning | Afternoon | Evening |\n|---|---|---|---|\n{rows}\n\n"
+        "## Tips\n- Carry a power bank\n- Book popular spots early\n\n**Estimated cost:** INR 38,000"
+    )
+
+
+class FakeLlm(BaseLlm):
+    model: str = "gemini-fake"  # google_search only accepts gemini-* model names
+    latency: float = 0.3
+    per_token: float = 0.0
+    failure_rate: float = 0.0
+
+    def _answer(self, request: LlmRequest) -> str:
+        instruction = str(request.config.system_instruction or "")
+        details = _trip_details(request)
+        if "tourist expert" in instruction:
+            parsed, _ = parse_trip_query(_user_text(request))
+            parsed = {k: v or fallback for (k, v), fallback in zip(parsed.items(), (
+                "Delhi", "Goa", 3, 40000.0, "2027-01-10", "2027-01-12", "",
+            ))}
+            return json.dumps(parsed)
+        if "flight booking agent" in instruction:
+            offer = {"airline": "6E", "departure": "DEL", "arrival": "GOI", "dep_time": "06:00", "arr_time": "08:30",
+                     "duration_min": 150, "stops": 0, "price": 4500.0, "currency": "INR"}
+            return "```json\n" + json.dumps({"offers": [offer], "note": ""}) + "\n```"
+        if "tourist guide in the destination" in instruction:
+            days = int(details.get("days_of_stay") or 3)
+            return json.dumps({"days": [
+                {"day": d, "morning": "Fort", "afternoon": "Museum", "evening": "Beach"} for d in range(1, days + 1)
+            ]})
+        if "financial expert" in instruction:
+            return _plan_markdown(details)
+        # WebView / ui_agents / optimizer / HtmlRender
+        return "<!DOCTYPE html><html><head><title>Trip</title></head><body>" + "<section><p>plan</p></section>" * 40 + "</body></html>"
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        rng = random.Random()
+        tools = (llm_request.tools_dict or {}).keys()
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(p.function_response for p in last.parts or [])
+
+        if "search_flights_async" in tools and not answered:
+            await asyncio.sleep(self.latency)
+            if rng.random() < self.failure_rate:
+                raise FakeLlmError("injected model failure")
+            details = _trip_details(llm_request)
+            args = {
+                "origin": details.get("origin") or "Delhi",
+                "destination": details.get("destination") or "Goa",
+                "departure_date": details.get("departure_date") or "2027-01-10",
+                "return_date": details.get("return_date") or None,
+                "adults": 2,
+            }
+            call = types.FunctionCall(name="search_flights_async", args={k: v for k, v in args.items() if v})
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+            return
+
+        text = self._answer(llm_request)
+        tokens_out = len(text) // 4
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=sum(len(str(c)) for c in llm_request.contents or []) // 4
+            + len(str(llm_request.config.system_instruction or "")) // 4,
+            candidates_token_count=tokens_out,
+        )
+        delay = self.latency + self.per_token * tokens_out
+        if rng.random() < self.failure_rate:
+            await asyncio.sleep(self.latency)
+            raise FakeLlmError("injected model failure")
+
+        if stream:
+            chunks = [text[i:i + 200] for i in range(0, len(text), 200)] or [""]
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        else:
+            await asyncio.sleep(delay)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), usage_metadata=usage, partial=False)
@@ -0,0 +1,335 @@
+from typing import AsyncGenerator, Callable, Dict, Optional, Type
+
+from google.genai import types
+from pydantic import BaseModel
+
+from google.adk.agents import Agent, BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import google_search
+
+import settings
+import telemetry
+from flights import search_flights_async, search_flights_flexible
+from plan_cache import PLAN_KEYS, plan_cache
+from render import RENDER_MODES, parse_state_value, render_plan_html
+from schemas import ActivityPlan, FlightOptions, StageOutputError, TripDetails, compact, parse_stage_output, shape
+from trip_parser import confident_trip_details
+
+MODEL = "gemini-2.5-flash-lite"
+APP_NAME = "Test App"
+
+#   ========================== Agent Instructions ==========================
+
+COORDINATOR_INSTRUCTION = """You are a tourist expert and provide an experienced guidance for making a trip for below mentioned details if available else asks for valid details clearly.
+
+    User will provide a sentence with their required trip details, you should fetch the required information from the sentence like origin, destination, days of stay, Budget, start_date, end_date and other preferences. Use this fetched details for further processing.
+    return a JSON object with
+    - origin (str)
+    - destination (str)
+    - days_of_stay (int)
+    - budget (float)
+    - departure_date (str, YYYY-MM-DD)
+    - return_date (str, YYYY-MM-DD)
+    - other_preferences (str)
+    """
+
+FLIGHT_INSTRUCTION = """You are a flight booking agent. The origin, destination, start_date(which is departure_date) and other details are mentioned in {trip_details} .
+    1. If they mentioned number of adults in preference mention it otherwise let it be 2 or 4
+    2. You need to use the `search_flights_async` tool to get the flight details. If the user is flexible on dates, use `search_flights_flexible` instead, which also checks the days around the departure date.
+       Pass non_stop, max_price or travel_class when the preferences ask for them, and sort_by="duration" or "stops" if they care more about time than money.
+    3. The tool already returns the best offers first. Keep them in that order, copying their fields from the tool result unchanged.
+    4. Return only JSON of this shape, with a short note if no flights were found: """ + shape(FlightOptions) + """
+
+    Note: You are not allowed to generate content other than the flight list.  You are not allowed to talk unnecessarily, just provide details.
+    """
+
+ACTIVITY_INSTRUCTION = """You are a tourist guide in the destination place mentioned in {trip_details}
+    For no of days mentioned above create activities to be performed each day, tell by morning, afternoon and evening activities based on the preference mentioned.
+    Try to make the activities stays within the budget mentioned. Provide each day activities in a time chart order.
+    1. Use `google_search` tool to get the activities list.
+    2. Select the activities from the activities list filtered by budget and preference mentioned in trip details.
+    3. You should Make a short time line like activities list for each day split by morning, afternoon and evening.
+    4. Return only JSON of this shape, one entry per day with a few words per slot: """ + shape(ActivityPlan) + """
+
+    Note: You should provide a basic roadmap for the activities to be performed. You are not allowed to talk unnecessarily, just provide details.
+    """
+
+COLLAB_INSTRUCTION = """You are a tourist guide and a financial expert.
+    1. Select best low price flight ticket from the list mentioned in {flights} and mention it.
+    2. Select all activities from the list mentioned in {activities} that fits within the budget. Provide a table like with each day activities.
+    3. Use all selected details from above and provide budget tips, accessory tips (like raincoat, selfie stick, powerbank, hiking shoes) and cost breakdown
+
+    Note: You are a friendly ReadMe generator.Avoid commanded message response and share a warm content with the user.You should provide estimated cost at the end.
+    """
+
+WEBVIEW_INSTRUCTION = """You are a fullstack developer and expert in making single HTML file with interative designs in it. The trip details are available as readme format in {trip_plan}, use those contents to generate a beautiful HTML page for Trip to provided destination. Use suitable elements for suitable contents like H2 for Trip heading, bullet points list for Guides and tips, table for expense breakdown, etc.
+    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
+    Note: If possible use Bootstrap and tailwind like frameworks for more interative designs like timeline slider for daily activities table. Try to make it more interactive and responsive.
+    Note: You are not allowed to talk unnecessarily, just provide details in HTML format.
+    """
+
+UI_INSTRUCTION = """You are a frontend expert in making single HTML file with responsive interative designs in it.
+    Use the {webview} and update the elements with more interactive and responsive designs. You are allowed to use tailwind, bootstrap and other frameworks that enhance the design. Enhance the UI/UX with different frameworks. update the basic html elements with framework elements which provides better interation and responsive and more attractive website. Create this within single HTML file. Try to avoid errors, bugs in generation.
+    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
+    Note: You are not allowed to talk unnecessarily, just provide details in HTML format.
+    Note: Remove copyright texts, copyright years  if any available in the HTML code.
+    """
+
+OPTIMIZER_INSTRUCTION = """You are a frontend expert in making single HTML file with responsive interative designs in it.
+    Use the {ui_view} and check for any bugs, errors, fixes. Try to fix them and solve the problems available in the HTML code. Try to optimize the code to run neatly in single file format itself.return the errorless code in HTML format.
+    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
+    Note: You are not allowed to talk unnecessarily, just provide details in HTML code in a string format, dont mention ```html ``` or any other texts.
+    Note: Remove copyright texts, copyright years  if any available in the HTML code.
+    """
+
+SINGLE_RENDER_INSTRUCTION = """You are a frontend expert in making a single, error free HTML file with responsive interactive designs in it.
+    The trip details are available as readme format in {trip_plan}; turn them directly into the final page for the trip to the provided destination.
+    Use suitable elements for suitable contents like H2 for Trip heading, bullet points list for Guides and tips, table for expense breakdown, a timeline for daily activities, etc.
+    You are allowed to use tailwind, bootstrap and other frameworks from a CDN for a colourful, responsive and attractive design.
+    Instruction: Use CSS, javacript inline for single file generation. Check your code for bugs before answering.
+    Note: You are not allowed to talk unnecessarily, just provide details in HTML code in a string format, dont mention ```html ``` or any other texts.
+    Note: Do not add copyright texts or copyright years.
+    """
+
+#   ========================== Agent Setup ==========================
+
+class TemplateRenderAgent(BaseAgent):
+    """Writes `final_ui` from session state with the local HTML template; no LLM call."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        page = render_plan_html(ctx.session.state)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=page)]),
+            actions=EventActions(state_delta={"final_ui": page}),
+        )
+
+class QueryParserAgent(BaseAgent):
+    """Fills `trip_details` with the local parser when it is confident, otherwise runs its
+    only sub-agent, the CoordinatorAgent LLM."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parts = ctx.user_content.parts if ctx.user_content and ctx.user_content.parts else []
+        details = confident_trip_details("".join(p.text or "" for p in parts))
+        if details is None:
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+            return
+
+        text = compact(TripDetails(**details))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={"trip_details": text}),
+        )
+
+class CachedPlanAgent(BaseAgent):
+    """Root agent that checks the plan cache once the CoordinatorAgent has extracted trip_details.
+
+    sub_agents are [coordinator, parallel_agent, collaborate, *render agents]. A full hit
+    replays the cached state and stops; a partial hit reuses the cached activities and
+    only runs the FlightAgent before the remaining stages; a miss runs everything and
+    stores the result.
+    """
+
+    render_mode: str = settings.RENDER_MODE
+
+    def _event(self, ctx: InvocationContext, state_delta: dict, text: str = "") -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]) if text else None,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        coordinator, parallel_agent, *rest = self.sub_agents
+
+        async for event in coordinator.run_async(ctx):
+            yield event
+        if ctx.end_invocation:
+            return
+
+        details = parse_state_value(ctx.session.state.get("trip_details"))
+        level, cached = plan_cache.lookup(details, self.render_mode) if details else ("miss", None)
+        print(f"[Plan Cache] {level} | {plan_cache.stats()}")
+
+        if level == "full":
+            state = {k: v for k, v in cached.state.items() if k != "trip_details"}
+            yield self._event(ctx, state, str(state.get("final_ui") or ""))
+            return
+
+        if level == "partial":
+            yield self._event(ctx, {"activities": cached.state["activities"]})
+            fetch = [a for a in parallel_agent.sub_agents if a.name == "FlightAgent"]
+        else:
+            fetch = [parallel_agent]
+
+        for agent in [*fetch, *rest]:
+            async for event in agent.run_async(ctx):
+                yield event
+            if ctx.end_invocation:
+                return
+
+        if details and ctx.session.state.get("final_ui"):
+            plan_cache.store(details, self.render_mode, {k: ctx.session.state.get(k) for k in PLAN_KEYS})
+
+def _render_agents(render_mode: str, model: Callable[[], BaseLlm]) -> list:
+    if render_mode == "template":
+        return [TemplateRenderAgent(name="TemplateRender", description="Renders the trip plan with the local HTML template.")]
+
+    if render_mode == "single":
+        return [Agent(
+            name = "HtmlRender",
+            description = "This Agent generates the final interactive frontend with trip details in one pass",
+            model = model(),
+            instruction = SINGLE_RENDER_INSTRUCTION,
+            output_key = "final_ui",
+        )]
+
+    webview = Agent(
+        name = "WebView",
+        description = "This Agent generates a Interactive frontend with trip details",
+        model = model(),
+        instruction = WEBVIEW_INSTRUCTION,
+        output_key = "webview",
+    )
+
+    ui_agent = Agent(
+        name = "ui_agents",
+        description = "This Agent generates a enhanced frontend with trip details",
+        model = model(),
+        instruction = UI_INSTRUCTION,
+        output_key = "ui_view",
+    )
+
+    optm = Agent(
+        name = "optimizer",
+        description = "This Agent rectifies errors in code and optimizes it.",
+        model = model(),
+        instruction = OPTIMIZER_INSTRUCTION,
+        output_key = "final_ui",
+    )
+    return [webview, ui_agent, optm]
+
+def _structured_output(key: str, model: Type[BaseModel]):
+    """after_agent_callback that validates state[key] against `model` and stores it as compact JSON.
+
+    Output that does not parse raises StageOutputError, ending the run there instead
+    of handing prose to the next agent.
+    """
+    def callback(callback_context: CallbackContext) -> None:
+        value = callback_context.state.get(key)
+        if value is None:
+            raise StageOutputError(f"{callback_context.agent_name} produced no {key}")
+        callback_context.state[key] = compact(parse_stage_output(model, value))
+        return None
+    return callback
+
+def _instrument(agent: BaseAgent) -> BaseAgent:
+    """Attach the telemetry callbacks to every agent in the graph; they are no-ops while telemetry is off."""
+    callbacks = dict(telemetry.AGENT_CALLBACKS, **(telemetry.LLM_CALLBACKS if isinstance(agent, LlmAgent) else {}))
+    for field, callback in callbacks.items():
+        # Run first, so a callback that raises cannot leave a span open
+        existing = getattr(agent, field)
+        existing = [] if existing is None else existing if isinstance(existing, list) else [existing]
+        setattr(agent, field, [callback, *existing])
+    for sub_agent in agent.sub_agents:
+        _instrument(sub_agent)
+    return agent
+
+def build_root_agent(render_mode: str = settings.RENDER_MODE, model_factory: Optional[Callable[[], BaseLlm]] = None) -> BaseAgent:
+    """Build a fresh agent graph; ADK agents can only have one parent, so every graph gets its own.
+
+    `model_factory` returns the model for each LLM agent, Gemini by default; the
+    benchmarks pass a local fake here.
+    """
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode '{render_mode}', expected one of {RENDER_MODES}")
+    model = model_factory or (lambda: Gemini(model=MODEL))
+
+    coordinator = Agent(
+        name = "CoordinatorAgent",
+        description = "Agent that fetches informations like origin, destination, days of stay, Budget and other preferences.",
+        model = model(),
+        instruction = COORDINATOR_INSTRUCTION,
+        output_schema = TripDetails,
+        output_key = "trip_details",
+        after_agent_callback = _structured_output("trip_details", TripDetails),
+    )
+    if settings.LOCAL_PARSER_ENABLED:
+        coordinator = QueryParserAgent(
+            name="QueryParser",
+            description="Reads trip details locally, falling back to the CoordinatorAgent.",
+            sub_agents=[coordinator],
+        )
+
+    planes = Agent(
+        name = "FlightAgent",
+        description = "This Agent get the flights in the trip",
+        model = model(),
+        instruction = FLIGHT_INSTRUCTION,
+        output_key = "flights",
+        tools = [search_flights_async, search_flights_flexible],
+        after_agent_callback = _structured_output("flights", FlightOptions),
+    )
+
+    activities = Agent(
+        name = "ActivityAgent",
+        description = "This Agent get the activities to happen in the trip",
+        model = model(),
+        instruction = ACTIVITY_INSTRUCTION,
+        output_key = "activities",
+        tools = [google_search],
+        after_agent_callback = _structured_output("activities", ActivityPlan),
+    )
+
+    parallel_agent = ParallelAgent(
+        name = "ParallelAgent",
+        description = "This Agent get the flights, hotels and activities in the trip",
+        sub_agents= [planes, activities]
+    )
+
+    collaborate = Agent(
+        name = "CollabAgent",
+        description = "This Agent combines all the parallel results and provide suitable trip plan.",
+        model = model(),
+        instruction = COLLAB_INSTRUCTION,
+        output_key = "trip_plan",
+    )
+
+    sub_agents = [coordinator, parallel_agent, collaborate, *_render_agents(render_mode, model)]
+    if settings.PLAN_CACHE_ENABLED:
+        root = CachedPlanAgent(
+            name="rootAgent",
+            description="Used to create a trip plan, reusing cached plans for the same trip",
+            sub_agents=sub_agents,
+            render_mode=render_mode,
+        )
+    else:
+        root = SequentialAgent(
+            name="rootAgent",
+            description="Used to create a trip plan",
+            sub_agents=sub_agents,
+        )
+    return _instrument(root)
+
+session_service = InMemorySessionService()
+_runners: Dict[str, Runner] = {}
+
+def get_runner(render_mode: str = settings.RENDER_MODE) -> Runner:
+    """One Runner per render mode, built on first use and sharing the session service."""
+    if render_mode not in _runners:
+        _runners[render_mode] = Runner(agent=build_root_agent(render_mode), app_name=APP_NAME, session_service=session_service)
+    return _runners[render_mode]
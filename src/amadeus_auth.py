@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import settings
+import telemetry
+from http_client import AsyncAmadeusClient, async_amadeus_client
+
+TOKEN_PATH = "/v1/security/oauth2/token"
+
+
+class TokenManager:
+    """Caches the Amadeus OAuth token until shortly before its `expires_in`."""
+
+    def __init__(self, async_client: Optional[AsyncAmadeusClient] = None, refresh_margin: Optional[float] = None):
+        self.async_client = async_client or async_amadeus_client
+        self.refresh_margin = settings.TOKEN_REFRESH_MARGIN if refresh_margin is None else refresh_margin
+        self._client_id: Optional[str] = None
+        self._client_secret: Optional[str] = None
+        # (access_token, monotonic time to refresh at) - swapped as one tuple so
+        # readers on the fast path never see a token paired with a stale expiry.
+        self._cached: Tuple[Optional[str], float] = (None, 0.0)
+        self._lock = threading.Lock()
+        # The refresh in progress, shared by every task on every event loop.
+        self._refresh: Optional[concurrent.futures.Future] = None
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def configure(self, client_id: str, client_secret: str) -> None:
+        """Set the client credentials; changing them drops the cached token."""
+        with self._lock:
+            if (client_id, client_secret) != (self._client_id, self._client_secret):
+                self._client_id = client_id
+                self._client_secret = client_secret
+                self._cached = (None, 0.0)
+
+    def invalidate(self) -> None:
+        """Forget the cached token, e.g. after Amadeus answered 401."""
+        self._cached = (None, 0.0)
+
+    async def aget_token(self) -> str:
+        """The cached token, refreshed first when it is about to expire.
+
+        Only one caller refreshes at a time, whichever task or event loop it runs on;
+        the others await its result. If that caller is cancelled, a waiter takes over.
+        """
+        while True:
+            token, refresh_at = self._cached
+            if token and time.monotonic() < refresh_at:
+                self._count("hits")
+                return token
+
+            with self._lock:
+                token, refresh_at = self._cached
+                if token and time.monotonic() < refresh_at:
+                    continue  # refreshed between the two reads
+                refresh = self._refresh
+                if refresh is None:
+                    refresh = self._refresh = concurrent.futures.Future()
+                    break  # this caller refreshes
+            try:
+                # Shielded, so a waiter that is cancelled does not cancel the refresh
+                return await asyncio.shield(asyncio.wrap_future(refresh))
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not refresh.cancelled() or (task.cancelling() if hasattr(task, "cancelling") else False):
+                    raise  # this task itself was cancelled
+                # Only the refreshing caller was: look again, and refresh if nobody has.
+
+        self._count("misses")
+        try:
+            r = await self.async_client.post(TOKEN_PATH, data=self._form())
+            r.raise_for_status()
+            token, expires_in = self._parse(r.json())
+            self._store(token, expires_in)
+            refresh.set_result(token)
+            return token
+        except asyncio.CancelledError:
+            refresh.cancel()
+            raise
+        except BaseException as e:
+            self._count("errors")
+            refresh.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._refresh is refresh:
+                    self._refresh = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _store(self, token: str, expires_in: float) -> None:
+        margin = min(self.refresh_margin, expires_in * 0.1)
+        self._cached = (token, time.monotonic() + expires_in - margin)
+
+    def _form(self) -> Dict[str, str]:
+        if not self._client_id or not self._client_secret:
+            raise RuntimeError("Amadeus credentials are not loaded")
+        return {
+            "grant_type": "client_credentials",
+            "client_id": self._client_id,
+            "client_secret": self._client_secret
+        }
+
+    def _parse(self, payload: dict) -> Tuple[str, float]:
+        expires_in = float(payload.get("expires_in", 1799))
+        print(f"[Token] Refreshed Amadeus token (expires in {int(expires_in)}s)")
+        return payload["access_token"], expires_in
+
+
+# Shared by every Amadeus call in the process.
+token_manager = TokenManager()
+telemetry.register_stats("amadeus_token", token_manager.stats)
@@ -0,0 +1,43 @@
+import json
+import os
+from typing import Dict
+
+# Keys of the credentials.json file the app asks for.
+REQUIRED_KEYS = ("GOOGLE_API", "Amadeus_KEY", "Amadeus_SECRET")
+
+# Environment fallbacks for headless runs, per key.
+ENV_KEYS = {
+    "GOOGLE_API": ("GEMINI_API_KEY", "GOOGLE_API_KEY"),
+    "Amadeus_KEY": ("AMADEUS_CLIENT_ID",),
+    "Amadeus_SECRET": ("AMADEUS_CLIENT_SECRET",),
+}
+
+
+class CredentialsError(ValueError):
+    """The credentials file or environment is missing a required key."""
+
+
+def read_file(path: str) -> Dict[str, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    missing = [k for k in REQUIRED_KEYS if not data.get(k)]
+    if missing:
+        raise CredentialsError(f"{path} is missing {', '.join(missing)}")
+    return data
+
+
+def read_env() -> Dict[str, str]:
+    data = {key: next((os.environ[n] for n in names if os.environ.get(n)), "") for key, names in ENV_KEYS.items()}
+    missing = [" or ".join(ENV_KEYS[k]) for k, v in data.items() if not v]
+    if missing:
+        raise CredentialsError(f"Set {', '.join(missing)}")
+    return data
+
+
+def apply(data: Dict[str, str]) -> None:
+    """Hand the keys to the Gemini client (through the environment) and the Amadeus token manager."""
+    from amadeus_auth import token_manager  # pulls in the HTTP clients, so only once credentials exist
+
+    os.environ["GEMINI_API_KEY"] = data["GOOGLE_API"]
+    token_manager.configure(data["Amadeus_KEY"], data["Amadeus_SECRET"])  # Amadeus calls these client id/secret
+    print("\n \n[Credentials] Loaded successfully.\n\n")
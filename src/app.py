@@ -1,256 +1,33 @@
-import flet as ft
-import tempfile
-import os
+import startup  # first, so the startup clock covers every import below
+
+with startup.timed_import("flet"):
+    import flet as ft
+import asyncio
 import webbrowser
-import json
-from typing import Dict, List
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 import uuid
-import requests
-from datetime import datetime
-from google.genai import types
-
-from google.adk.agents import Agent, LlmAgent, ParallelAgent, SequentialAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools import google_search, AgentTool
-
-# Global state
-credentials: Dict[str, str] = {}
-html_list: List[str] = []  # This will store all generated HTMLs in order
-
-global GOOGLE_API_KEY
-global AMADEUS_CLIENT_ID
-global AMADEUS_CLIENT_SECRET
-
-#   ========================= Custom Tools Functions =========================
 
-def _get_token():
-    
-    AMADEUS_CLIENT_ID = credentials["Amadeus_KEY"]           # often called client_id in Amadeus
-    AMADEUS_CLIENT_SECRET = credentials["Amadeus_SECRET"]
-
-    url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": AMADEUS_CLIENT_ID,
-        "client_secret": AMADEUS_CLIENT_SECRET
-    }
-  
-    r = requests.post(url, data=data, timeout=10)
-    r.raise_for_status()
-    return r.json()["access_token"]
-
-def _iata_lookup(city: str) -> str:
-    """Convert city name → IATA code (city-level preferred)"""
-    if not city or len(city.strip()) < 2:
-        return city[:3].upper()
-
-    city = city.strip()
-    try:
-        token = _get_token()
-        url = "https://test.api.amadeus.com/v1/reference-data/locations"
-        params = {
-            "keyword": city,
-            "subType": "CITY,AIRPORT",
-            "view": "LIGHT"
-        }
-        headers = {"Authorization": f"Bearer {token}"}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        r.raise_for_status()
-        data = r.json().get("data", [])
-
-        if not data:
-            print(f"[IATA Lookup] No results for '{city}'")
-            return city[:3].upper()
-
-        # Prefer CITY over AIRPORT
-        for loc in data:
-            if loc.get("subType") == "CITY":
-                iata = loc["iataCode"]
-                print(f"[IATA Lookup] {city} → {iata} (CITY)")
-                return iata
-        # Fallback to first airport
-        iata = data[0]["iataCode"]
-        print(f"[IATA Lookup] {city} → {iata} (AIRPORT)")
-        return iata
-
-    except Exception as e:
-        print(f"[IATA Lookup] Error for '{city}': {e}")
-        return city[:3].upper()
-
-def search_flights(
-    origin: str,
-    destination: str,
-    departure_date: str,
-    adults: int = 1,
-    return_date: str = "",
-    currency: str = "INR",
-    max_results: int = 3
-) -> list:
-    try:
-        origin_code = _iata_lookup(origin)
-        dest_code = _iata_lookup(destination)
-
-        if len(origin_code) != 3 or len(dest_code) != 3:
-          return [{"error": f"Invalid IATA: origin='{origin_code}', dest='{dest_code}'"}]
-
-        token = _get_token()
-        url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-        params = {
-            "originLocationCode": origin_code,
-            "destinationLocationCode": dest_code,
-            "departureDate": departure_date,
-            "adults": adults,
-            "currencyCode": currency,
-            "max": max_results * 2
-        }
-        if return_date:
-            params["returnDate"] = return_date
-
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=params, timeout=15)
-        if r.status_code != 200:
-            return [{"error": f"API {r.status_code}: {r.text[:100]}"}]
-
-        offers = r.json().get("data", [])[:max_results]
-        results = []
-        for o in offers:
-            seg = o["itineraries"][0]["segments"]
-            results.append({
-                "price": f"{o['price']['currency']} {o['price']['total']}",
-                "airline": seg[0]["carrierCode"],
-                "departure": seg[0]["departure"]["iataCode"],
-                "arrival": seg[-1]["arrival"]["iataCode"],
-                "dep_time": seg[0]["departure"]["at"][11:16],
-                "arr_time": seg[-1]["arrival"]["at"][11:16],
-                "stops": len(seg) - 1
-            })
-        print(f"[Flight Search] Found {len(results)} offers from {origin_code} to {dest_code}")
-        return results or [{"info": "No flights found"}]
-    except Exception as e:
-        return [{"error": str(e)}]
-
-#   ========================== Agent Setup ==========================
-
-coordinator = Agent(
-    name = "CoordinatorAgent",
-    description = "Agent that fetches informations like origin, destination, days of stay, Budget and other preferences.",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a tourist expert and provide an experienced guidance for making a trip for below mentioned details if available else asks for valid details clearly.
-
-    User will provide a sentence with their required trip details, you should fetch the required information from the sentence like origin, destination, days of stay, Budget, start_date, end_date and other preferences. Use this fetched details for further processing.
-    return a dictionary of
-    - origin (str)
-    - destination (str)
-    - days_of_stay (int)
-    - budget (float)
-    - departure_date (str)
-    - return_date (str)
-    - other_preferences (str)
-    """,
-    output_key = "trip_details",
-)
-
-planes = Agent(
-    name = "FlightAgent",
-    description = "This Agent get the flights in the trip",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a flight booking agent. The origin, destination, start_date(which is departure_date) and other details are mentioned in {trip_details} .
-    1. If they mentioned number of adults in preference mention it otherwise let it be 2 or 4
-    2. You need to use the `search_flights` tool to get the flight details.
-    3. Summarize the budget friendly flights available in short with their details
-    3. Return the flight list in dictionary format for further use.
-
-    Note: You are not allowed to generate content other than the flight list.  You are not allowed to talk unnecessarily, just provide details.
-    """,
-    output_key = "flights",
-    tools = [search_flights],
-)
-
-activities = Agent(
-    name = "ActivityAgent",
-    description = "This Agent get the activities to happen in the trip",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a tourist guide in the destination place mentioned in {trip_details}
-    For no of days mentioned above create activities to be performed each day, tell by morning, afternoon and evening activities based on the preference mentioned.
-    Try to make the activities stays within the budget mentioned. Provide each day activities in a time chart order.
-    1. Use `google_search` tool to get the activities list.
-    2. Select the activities from the activities list filtered by budget and preference mentioned in trip details.
-    3. You should Make a short time line like activities list for each day split by morning, afternoon and evening.
-    4. Return the activities list in dictionary format for further use.
-
-    Note: You should provide a basic roadmap for the activities to be performed. You are not allowed to talk unnecessarily, just provide details.
-    """,
-    output_key = "activities",
-    tools = [google_search],
-)
-
-parallel_agent = ParallelAgent(
-    name = "ParallelAgent",
-    description = "This Agent get the flights, hotels and activities in the trip",
-    sub_agents= [planes, activities]
-)
-
-collaborate = Agent(
-    name = "CollabAgent",
-    description = "This Agent combines all the parallel results and provide suitable trip plan.",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a tourist guide and a financial expert.
-    1. Select best low price flight ticket from the list mentioned in {flights} and mention it.
-    2. Select all activities from the list mentioned in {activities} that fits within the budget. Provide a table like with each day activities.
-    3. Use all selected details from above and provide budget tips, accessory tips (like raincoat, selfie stick, powerbank, hiking shoes) and cost breakdown
-
-    Note: You are a friendly ReadMe generator.Avoid commanded message response and share a warm content with the user.You should provide estimated cost at the end.
-    """,
-    output_key = "trip_plan",
-)
-
-webview = Agent(
-    name = "WebView",
-    description = "This Agent generates a Interactive frontend with trip details",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a fullstack developer and expert in making single HTML file with interative designs in it. The trip details are available as readme format in {trip_plan}, use those contents to generate a beautiful HTML page for Trip to provided destination. Use suitable elements for suitable contents like H2 for Trip heading, bullet points list for Guides and tips, table for expense breakdown, etc.
-    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
-    Note: If possible use Bootstrap and tailwind like frameworks for more interative designs like timeline slider for daily activities table. Try to make it more interactive and responsive.
-    Note: You are not allowed to talk unnecessarily, just provide details in HTML format.
-    """,
-    output_key = "webview",
-)
-
-ui_agent = Agent(
-    name = "ui_agents",
-    description = "This Agent generates a enhanced frontend with trip details",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a frontend expert in making single HTML file with responsive interative designs in it.
-    Use the {webview} and update the elements with more interactive and responsive designs. You are allowed to use tailwind, bootstrap and other frameworks that enhance the design. Enhance the UI/UX with different frameworks. update the basic html elements with framework elements which provides better interation and responsive and more attractive website. Create this within single HTML file. Try to avoid errors, bugs in generation.
-    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
-    Note: You are not allowed to talk unnecessarily, just provide details in HTML format.
-    Note: Remove copyright texts, copyright years  if any available in the HTML code.
-    """,
-    output_key = "ui_view",
-)
-
-optm = Agent(
-    name = "optimizer",
-    description = "This Agent rectifies errors in code and optimizes it.",
-    model = Gemini(model="gemini-2.5-flash-lite"),
-    instruction = """You are a frontend expert in making single HTML file with responsive interative designs in it.
-    Use the {ui_view} and check for any bugs, errors, fixes. Try to fix them and solve the problems available in the HTML code. Try to optimize the code to run neatly in single file format itself.return the errorless code in HTML format.
-    Instruction: Use CSS, javacript inline for single file generation. create a colourful combo's and design.
-    Note: You are not allowed to talk unnecessarily, just provide details in HTML code in a string format, dont mention ```html ``` or any other texts.
-    Note: Remove copyright texts, copyright years  if any available in the HTML code.
-    """,
-    output_key = "final_ui",
-)
-
-root_agent = SequentialAgent(
-    name="rootAgent",
-    description="Used to create a trip plan",
-    sub_agents=[coordinator, parallel_agent, collaborate, webview, ui_agent, optm],
-)
-
-session_service = InMemorySessionService()
-runner = Runner(agent=root_agent, app_name="Test App", session_service=session_service)
+import api_keys
+import settings
+from api_keys import CredentialsError
+from plan_store import plan_store
+from prefetch import Prefetcher
+from scheduler import JobCancelledError, QueueFullError, scheduler
+from render import RENDER_MODES, record_run
+
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
+    from pipeline import Progress
+
+# google.adk / google.genai take seconds to import, so `agents`, `pipeline` and the
+# Amadeus client are loaded on demand: the credential card is drawn first and the
+# agent graph is only built for the first query.
+HEAVY_MODULES = ("agents", "pipeline")
+# pipeline.DRAFT_AUTHORS, kept here so the chat can be drawn before pipeline is imported
+DRAFT_AUTHORS = ("CollabAgent",)
 
 #  ============================= Main application =============================
 
@@ -262,6 +39,10 @@ def main(page: ft.Page):
     page.window_resizable = True
     page.padding = 20
 
+    # Scopes scheduling and agent sessions to this window/browser tab
+    user_id = page.session_id or uuid.uuid4().hex
+    plans_shown = 0
+
     # ====================== FILE PICKER ======================
     def load_credentials(e: ft.FilePickerResultEvent):
         if not e.files:
@@ -272,25 +53,16 @@ def main(page: ft.Page):
 
         file = e.files[0]
         try:
-            with open(file.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            required = ["GOOGLE_API", "Amadeus_KEY", "Amadeus_SECRET"]
-            if not all(k in data for k in required):
+            try:
+                data = api_keys.read_file(file.path)
+            except CredentialsError:
                 page.snack_bar = ft.SnackBar(ft.Text("Missing keys!"))
                 page.snack_bar.open = True
                 page.update()
                 return
 
-            global credentials
-            credentials = data
-
-            GOOGLE_API_KEY = data["GOOGLE_API"]
-            AMADEUS_CLIENT_ID = data["Amadeus_KEY"]           # often called client_id in Amadeus
-            AMADEUS_CLIENT_SECRET = data["Amadeus_SECRET"]
-            print("\n \n[Credentials] Loaded successfully.\n\n")
-
-            os.environ["GEMINI_API_KEY"] = GOOGLE_API_KEY
+            with startup.timed_import("amadeus_auth"):
+                api_keys.apply(data)
 
             credential_card.visible = False
             main_ui.visible = True
@@ -299,6 +71,10 @@ def main(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
+            if settings.PREWARM_AGENTS:
+                # Import the agent modules while the user types their first question
+                threading.Thread(target=load_heavy_modules, daemon=True).start()
+
         except Exception as ex:
             page.snack_bar = ft.SnackBar(ft.Text(f"Error: {ex}"))
             page.snack_bar.open = True
@@ -340,6 +116,12 @@ def main(page: ft.Page):
     chat_history = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
 
     # ====================== INPUT BAR (bottom fixed) ======================
+    # Warms the flight caches for the route being typed, see prefetch.py
+    prefetcher = Prefetcher() if settings.PREFETCH_ENABLED else None
+
+    def on_input_change(e):
+        page.run_task(prefetcher.text_changed, chat_input.value or "")
+
     chat_input = ft.TextField(
         hint_text="Where do you want to go? (e.g. Paris in December)",
         expand=True,
@@ -350,6 +132,14 @@ def main(page: ft.Page):
         hint_style=ft.TextStyle(
             color=ft.Colors.BLACK,        # Your desired hint color
         ),
+        on_change=on_input_change if prefetcher else None,
+    )
+
+    render_mode_picker = ft.Dropdown(
+        value=settings.RENDER_MODE,
+        options=[ft.dropdown.Option(m) for m in RENDER_MODES],
+        width=130,
+        tooltip="How the final HTML plan is rendered",
     )
 
     def send_message(e):
@@ -372,12 +162,16 @@ def main(page: ft.Page):
         chat_input.value = ""
         page.update()
 
+        if prefetcher:
+            page.run_task(prefetcher.submitted, query)
+
         # Generate plan and add new button
-        page.run_task(process_personal_function, query)
+        page.run_task(process_personal_function, query, render_mode_picker.value)
 
     input_bar = ft.Container(
         ft.Row([
             chat_input,
+            render_mode_picker,
             ft.IconButton(ft.Icons.SEND_ROUNDED, icon_color=ft.Colors.WHITE, on_click=send_message)
         ], vertical_alignment="center"),
         padding=10,
@@ -395,23 +189,36 @@ def main(page: ft.Page):
     ], expand=True, visible=False)
 
     # ====================== PROCESS QUERY & ADD BUTTON ======================
-    async def run_agent(query: str, runner: Runner) -> str:
-        
-        response = await runner.run_debug(
-            query, verbose=False
+    async def run_agent(query: str, render_mode: str, on_progress=None) -> str:
+        # First query: import the agent modules (unless prewarmed) and build the graph
+        agents, pipeline = await asyncio.to_thread(load_heavy_modules)
+        runner: "Runner" = agents.get_runner(render_mode)
+
+        # Every query gets its own one-shot session so concurrent plans never share state keys
+        result = await pipeline.run_pipeline(
+            runner, query, user_id=user_id, session_id=uuid.uuid4().hex, on_progress=on_progress, discard_session=True,
+            partial_authors=DRAFT_AUTHORS,
         )
+        record_run(render_mode, result.elapsed, result.tokens_in, result.tokens_out)
+        print(f"[Pipeline] Stage timings: {result.stage_seconds}")
         # Safely extract the final text part
-        return response[-1].content.parts[0].text
-        return "<h3>Sorry, no plan generated. Try again!</h3>"
+        return result.final_text or "<h3>Sorry, no plan generated. Try again!</h3>"
     
-    async def process_personal_function(query: str):
-        global html_list
-        # Optional: Add a nice loading bubble
+    async def process_personal_function(query: str, render_mode: str):
+        nonlocal plans_shown
+        # Loading bubble that fills in as each agent reports back
+        status_text = ft.Text("Crafting your perfect trip plan...", color=ft.Colors.GREY_400)
+        done_steps = ft.Column(spacing=2)
+        draft_preview = ft.Markdown("", visible=False)
         loading_bubble = ft.Container(
-            content=ft.Row([
-                ft.ProgressRing(width=20, height=20, stroke_width=3),
-                ft.Text("Crafting your perfect trip plan...", color=ft.Colors.GREY_400),
-            ], spacing=10),
+            content=ft.Column([
+                ft.Row([
+                    ft.ProgressRing(width=20, height=20, stroke_width=3),
+                    status_text,
+                ], spacing=10),
+                done_steps,
+                draft_preview,
+            ], spacing=8),
             bgcolor=ft.Colors.GREEN_900,
             padding=15,
             border_radius=20,
@@ -420,25 +227,52 @@ def main(page: ft.Page):
         chat_history.controls.append(loading_bubble)
         page.update()
 
+        last_refresh = 0.0
+
+        async def show_progress(progress: "Progress"):
+            nonlocal last_refresh
+            if progress.kind == "partial":
+                # Streamed draft of the plan, redrawn at most every 0.25s
+                if progress.author not in DRAFT_AUTHORS:
+                    return
+                draft_preview.value = progress.text
+                draft_preview.visible = True
+                if time.monotonic() - last_refresh < 0.25:
+                    return
+            elif progress.kind == "stage_started":
+                status_text.value = f"{progress.label}..."
+            elif progress.kind == "stage_done":
+                done_steps.controls.append(ft.Text(f"✓ {progress.label}", size=12, color=ft.Colors.GREEN_200))
+                if progress.author in DRAFT_AUTHORS:
+                    draft_preview.value = progress.text
+                    draft_preview.visible = True
+            last_refresh = time.monotonic()
+            page.update()
+
         try:
-            new_html = await run_agent(query, runner)  # This is the only correct way
+            job = scheduler.submit(user_id, lambda: run_agent(query, render_mode, show_progress))
+            waiting = scheduler.stats()["queue_depth"]
+            if waiting > 1:
+                status_text.value = f"Waiting for a free planner ({waiting - 1} ahead)..."
+                page.update()
+            new_html = await job.result()
 
             # Remove loading
             chat_history.controls.remove(loading_bubble)
 
-            # Save and show result
-            html_list.append(new_html)
-            current_index = len(html_list) - 1
+            # Save and show result; the store keeps only recent plans in memory
+            plan_id = plan_store.add(new_html)
+            plans_shown += 1
 
             expand_btn = ft.ElevatedButton(
-                f"Expand Plan #{len(html_list)}",
+                f"Expand Plan #{plans_shown}",
                 icon=ft.Icons.AUTO_AWESOME_MOTION_OUTLINED,
                 bgcolor=ft.Colors.PURPLE_600,
                 color=ft.Colors.WHITE,
                 height=60,
                 width=300,
                 style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=30)),
-                on_click=lambda e, idx=current_index: open_full_plan(html_list[idx]),
+                on_click=lambda e, pid=plan_id: open_full_plan(pid),
             )
 
             chat_history.controls.append(
@@ -455,6 +289,21 @@ def main(page: ft.Page):
                 )
             )
 
+        except JobCancelledError:
+            # A newer question from this user replaced this one
+            if loading_bubble in chat_history.controls:
+                chat_history.controls.remove(loading_bubble)
+            chat_history.controls.append(
+                ft.Container(ft.Text("Cancelled – replaced by your newer question", color=ft.Colors.GREY_400, size=12), padding=5)
+            )
+
+        except QueueFullError:
+            if loading_bubble in chat_history.controls:
+                chat_history.controls.remove(loading_bubble)
+            chat_history.controls.append(
+                ft.Container(ft.Text("TripWise is busy right now, please try again in a moment.", color=ft.Colors.ORANGE), bgcolor=ft.Colors.ORANGE_900, padding=15)
+            )
+
         except Exception as e:
             if loading_bubble in chat_history.controls:
                 chat_history.controls.remove(loading_bubble)
@@ -466,16 +315,20 @@ def main(page: ft.Page):
         page.scroll_to(delta=10000, duration=500)
 
     # ====================== FULL PLAN WINDOW ======================
-    def open_full_plan(html_content: str):
-                
-        # Write HTML to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            f.write(html_content)
-            temp_path = f.name
-        
+    def open_full_plan(plan_id: int):
+
+        # Written to disk on the first click, the same file is reused afterwards
+        path = plan_store.html_path(plan_id)
+        if path is None:
+            page.snack_bar = ft.SnackBar(ft.Text("This plan has expired, please ask again"))
+            page.snack_bar.open = True
+            page.update()
+            return
+
         # Open in default browser
-        webbrowser.open(f'file://{os.path.abspath(temp_path)}')
-        
+        webbrowser.open(Path(path).as_uri())
+        print(f"[Plan Store] {plan_store.stats()}")
+
 
     # ====================== LAYOUT ======================
     page.add(
@@ -487,5 +340,25 @@ def main(page: ft.Page):
     )
 
     page.update()
+    startup.mark("first frame")
+    if settings.STARTUP_REPORT:
+        startup.print_report()
+
+
+_heavy_lock = threading.Lock()
+_heavy_modules: tuple = ()
+
+
+def load_heavy_modules() -> tuple:
+    """Import (once) and return the modules that pull in google.adk."""
+    global _heavy_modules
+    with _heavy_lock:
+        if not _heavy_modules:
+            _heavy_modules = tuple(startup.import_module(name) for name in HEAVY_MODULES)
+            if settings.STARTUP_REPORT:
+                startup.print_report()
+    return _heavy_modules
+
 
-ft.app(target=main)
\ No newline at end of file
+if __name__ == "__main__":
+    ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""Plan many trips offline from a JSONL or CSV file of queries.
+
+    python src/batch.py queries.jsonl --out plans.jsonl --workers 4
+    python src/batch.py destinations.csv --format html --out plans/ --render-mode template
+
+Input rows need a "query" and may carry an "id" and a "render_mode"; rows without an id
+get one from their position. Every row runs through the same agent graph, and the Amadeus
+token, IATA, flight and plan caches are shared across the whole batch. Finished ids are
+appended to a checkpoint file (default <out>.checkpoint), so a run started again with
+the same arguments skips them and retries only what failed or never ran.
+
+--format jsonl appends one JSON object per plan (HTML and structured plan included);
+--format html writes <out>/<id>.html per plan.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Set
+
+import api_keys
+import settings
+import telemetry
+from agents import get_runner
+from http_client import async_amadeus_client
+from pipeline import run_pipeline
+from plan_cache import PLAN_KEYS
+from render import RENDER_MODES, parse_state_value
+
+
+def read_queries(path: str) -> Iterator[Dict[str, str]]:
+    """Rows of the input file, read lazily so huge catalogues do not sit in memory."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for n, row in enumerate(rows, start=1):
+            if not str(row.get("query") or "").strip():
+                print(f"[Batch] Row {n} has no query, skipped")
+                continue
+            row["id"] = str(row.get("id") or f"row-{n}")
+            yield row
+
+
+def describe(error: BaseException) -> str:
+    # ParallelAgent failures arrive wrapped in an ExceptionGroup; report the first real one.
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def read_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue  # a torn last line from a crash
+    return done
+
+
+class BatchWriter:
+    """Writes each finished plan as it arrives and marks it done in the checkpoint."""
+
+    def __init__(self, out: str, fmt: str, checkpoint: str):
+        self.fmt = fmt
+        self.out = out
+        if fmt == "html":
+            os.makedirs(out, exist_ok=True)
+            self._jsonl = None
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+            self._jsonl = open(out, "a", encoding="utf-8")
+        self._checkpoint = open(checkpoint, "a", encoding="utf-8")
+
+    def write(self, record: Dict) -> None:
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(record, default=str) + "\n")
+            self._jsonl.flush()
+        else:
+            name = re.sub(r"[^\w.-]+", "_", record["id"]) + ".html"
+            with open(os.path.join(self.out, name), "w", encoding="utf-8") as f:
+                f.write(record["html"])
+        # Only after the plan itself is on disk, so a crash in between just redoes it.
+        self._checkpoint.write(json.dumps({"id": record["id"], "at": time.time()}) + "\n")
+        self._checkpoint.flush()
+        os.fsync(self._checkpoint.fileno())
+
+    def close(self) -> None:
+        if self._jsonl is not None:
+            self._jsonl.close()
+        self._checkpoint.close()
+
+
+async def run_batch(
+    rows: Iterator[Dict[str, str]],
+    writer: BatchWriter,
+    done: Set[str],
+    workers: int,
+    render_mode: str,
+    timeout: float,
+) -> Dict:
+    latencies: List[float] = []
+    counters = {"ok": 0, "failed": 0, "skipped": 0, "tokens_in": 0, "tokens_out": 0}
+    failures: Dict[str, str] = {}
+    start = time.perf_counter()
+
+    async def worker() -> None:
+        # Every worker pulls from the same row iterator; asyncio never interleaves a next().
+        for row in rows:
+            if row["id"] in done:
+                counters["skipped"] += 1
+                continue
+            mode = row.get("render_mode") or render_mode
+            try:
+                if mode not in RENDER_MODES:
+                    raise ValueError(f"unknown render_mode '{mode}'")
+                result = await asyncio.wait_for(
+                    run_pipeline(
+                        get_runner(mode), row["query"], user_id="batch", session_id=uuid.uuid4().hex,
+                        stream=False, discard_session=True, state_keys=PLAN_KEYS,
+                    ),
+                    timeout=timeout,
+                )
+            except Exception as e:
+                counters["failed"] += 1
+                failures[row["id"]] = describe(e)
+                print(f"[Batch] {row['id']} failed: {failures[row['id']]}")
+                continue
+
+            latencies.append(result.elapsed)
+            counters["ok"] += 1
+            counters["tokens_in"] += result.tokens_in
+            counters["tokens_out"] += result.tokens_out
+            writer.write({
+                "id": row["id"],
+                "query": row["query"],
+                "render_mode": mode,
+                "elapsed_s": round(result.elapsed, 3),
+                "tokens_in": result.tokens_in,
+                "tokens_out": result.tokens_out,
+                "stage_seconds": result.stage_seconds,
+                "plan": {k: parse_state_value(result.state.get(k)) or result.state.get(k) for k in ("trip_details", "flights", "activities", "trip_plan")},
+                "html": result.final_text,
+            })
+            print(f"[Batch] {row['id']} done in {result.elapsed:.1f}s ({counters['ok']} ok, {counters['failed']} failed)")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    finally:
+        await async_amadeus_client.aclose()  # the pool belongs to this asyncio.run's loop
+    wall = time.perf_counter() - start
+
+    summary = dict(counters, wall_s=round(wall, 2), plans_per_min=round(counters["ok"] / wall * 60, 2) if wall else 0.0)
+    if latencies:
+        cuts = statistics.quantiles(latencies, n=20, method="inclusive") if len(latencies) > 1 else [latencies[0]] * 19
+        summary.update(p50_s=round(statistics.median(latencies), 3), p95_s=round(cuts[18], 3), max_s=round(max(latencies), 3))
+    summary["failures"] = failures
+    summary["components"] = telemetry.snapshot()
+    return summary
+
+
+def print_summary(summary: Dict) -> None:
+    print("\n========== Batch summary ==========")
+    print(f"ok {summary['ok']}, failed {summary['failed']}, skipped (checkpoint) {summary['skipped']}")
+    print(f"wall {summary['wall_s']}s, {summary['plans_per_min']} plans/min", end="")
+    if "p50_s" in summary:
+        print(f", latency p50 {summary['p50_s']}s p95 {summary['p95_s']}s max {summary['max_s']}s")
+    else:
+        print()
+    print(f"tokens in/out {summary['tokens_in']}/{summary['tokens_out']}")
+    for component, stats in summary["components"].items():
+        print(f"  {component}: {stats}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL or CSV file with a 'query' column")
+    parser.add_argument("--out", required=True, help="JSONL file, or a directory with --format html")
+    parser.add_argument("--format", choices=("jsonl", "html"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=settings.PLAN_WORKERS)
+    parser.add_argument("--render-mode", default=settings.RENDER_MODE, choices=RENDER_MODES)
+    parser.add_argument("--timeout", type=float, default=settings.API_PLAN_TIMEOUT, help="seconds per plan")
+    parser.add_argument("--checkpoint", default=None, help="default: <out>.checkpoint")
+    parser.add_argument("--credentials", default=settings.API_CREDENTIALS_FILE, help="credentials.json (default: environment)")
+    parser.add_argument("--summary", default=None, help="also write the summary as JSON here")
+    args = parser.parse_args(argv)
+
+    try:
+        api_keys.apply(api_keys.read_file(args.credentials) if args.credentials else api_keys.read_env())
+    except (OSError, ValueError) as e:
+        print(f"[Batch] Credentials not loaded: {e}")
+        return 2
+
+    checkpoint = args.checkpoint or args.out.rstrip("/\\") + ".checkpoint"
+    done = read_checkpoint(checkpoint)
+    if done:
+        print(f"[Batch] Resuming: {len(done)} plans already done in {checkpoint}")
+
+    writer = BatchWriter(args.out, args.format, checkpoint)
+    try:
+        summary = asyncio.run(run_batch(read_queries(args.input), writer, done, args.workers, args.render_mode, args.timeout))
+    finally:
+        writer.close()
+        telemetry.flush()
+
+    print_summary(summary)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
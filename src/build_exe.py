@@ -1,4 +1,5 @@
 # launcher.py
+import startup  # first, so the startup report covers the whole launch
 import flet
 from app import main   # ← CHANGE "your_main_file" to your actual filename (without .py)
 
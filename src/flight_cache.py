@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import settings
+import telemetry
+
+# Cached value: (offer list, unix time it was fetched from Amadeus).
+Entry = Tuple[List[Dict], float]
+
+# Expired rows are deleted when the disk store opens and after every this many writes.
+PURGE_EVERY = 100
+
+
+def offer_key(origin_code, dest_code, departure_date, adults, return_date, currency, non_stop=False, max_price=0.0, travel_class="") -> str:
+    """Normalized cache key of one Amadeus query; raises ValueError for dates that are not ISO YYYY-MM-DD.
+
+    Ranking and top-k happen after the cache, so they are not part of the key.
+    """
+    return "|".join([
+        origin_code.upper(),
+        dest_code.upper(),
+        date.fromisoformat(departure_date).isoformat(),
+        date.fromisoformat(return_date).isoformat() if return_date else "",
+        str(int(adults)),
+        (currency or "").upper(),
+        "nonstop" if non_stop else "",
+        str(int(max_price or 0)),
+        (travel_class or "").upper(),
+    ])
+
+
+def _is_error(results: List[Dict]) -> bool:
+    return any("error" in r for r in results)
+
+
+class FlightOfferDiskStore:
+    """SQLite table of offer lists so a restart does not start cold."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS offers (key TEXT PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload, fetched_at FROM offers WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put(self, key: str, entry: Entry) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO offers (key, payload, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry[0]), entry[1]),
+            )
+
+    def purge_older_than(self, fetched_before: float) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM offers WHERE fetched_at < ?", (fetched_before,)).rowcount
+
+
+class FlightOfferCache:
+    """Short-lived LRU of flight-offer results; identical concurrent lookups share one upstream call."""
+
+    def __init__(
+        self,
+        ttl: float = settings.FLIGHT_CACHE_TTL,
+        max_size: int = settings.FLIGHT_CACHE_SIZE,
+        db_path: Optional[str] = settings.FLIGHT_CACHE_DB,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._memory: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._futures: Dict[str, "asyncio.Future[Entry]"] = {}
+        self.disk: Optional[FlightOfferDiskStore] = None
+        self._writes = 0
+        if db_path:
+            try:
+                disk = FlightOfferDiskStore(db_path)
+                disk.purge_older_than(time.time() - self.ttl)
+                self.disk = disk
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Flight Cache] Disk store unavailable ({e}), using memory only")
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "merged": 0}
+
+    def get(self, key: str) -> Optional[Entry]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry
+
+        if self.disk:
+            entry = self.disk.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._remember(key, entry)
+                self._count("disk_hits")
+                return entry
+        return None
+
+    def put(self, key: str, results: List[Dict]) -> Entry:
+        entry = (results, time.time())
+        if _is_error(results):
+            return entry  # errors are never cached
+        self._remember(key, entry)
+        if self.disk:
+            try:
+                self.disk.put(key, entry)
+                with self._lock:
+                    self._writes += 1
+                    purge = self._writes % PURGE_EVERY == 0
+                if purge:
+                    self.disk.purge_older_than(time.time() - self.ttl)
+            except sqlite3.Error as e:
+                print(f"[Flight Cache] Could not persist '{key}': {e}")
+        return entry
+
+    async def afetch(self, key: str, loader: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        """Cached results for `key`; tasks asking for the same key await one upstream call."""
+        while True:
+            entry = self.get(key)
+            if entry:
+                return annotate(entry, True)
+
+            future = self._futures.get(key)
+            if future is None or future.get_loop() is not asyncio.get_running_loop():
+                break
+            self._count("merged")
+            try:
+                return annotate(await asyncio.shield(future), True)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task.cancelling() if hasattr(task, "cancelling") else False):
+                    raise  # this task itself was cancelled
+                # Only the leading task was (a superseded plan, a typed-over prefetch):
+                # look again, and lead the fetch if nobody else has taken over.
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        self._count("misses")
+        try:
+            entry = self.put(key, await loader())
+            future.set_result(entry)
+            return annotate(entry, False)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, size=len(self._memory))
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+
+def annotate(entry: Entry, from_cache: bool) -> List[Dict]:
+    """Copy of the offers tagged with where they came from and when they were fetched."""
+    results, fetched_at = entry
+    stamp = datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(timespec="seconds")
+    return [dict(r, from_cache=from_cache, fetched_at=stamp) for r in results]
+
+
+flight_cache = FlightOfferCache()
+telemetry.register_stats("flight_cache", flight_cache.stats)
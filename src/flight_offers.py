@@ -0,0 +1,89 @@
+import re
+from typing import Dict, List
+
+import numpy as np
+
+# Amadeus flight-offer payloads reduced to compact numeric records and ranked locally.
+#
+# Amadeus is asked for a wide candidate set (settings.FLIGHT_CANDIDATES) once per route
+# and filter combination; ranking and the top-k cut happen here, so different
+# max_results / sort_by values reuse one cached upstream call.
+TRAVEL_CLASSES = ("ECONOMY", "PREMIUM_ECONOMY", "BUSINESS", "FIRST")
+RANK_KEYS = ("price", "duration", "stops")
+
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?")
+
+
+def duration_minutes(value: str) -> int:
+    """ISO-8601 duration such as "PT2H35M" or "P1DT3H" in minutes, 0 if unparseable."""
+    match = _DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(g or 0) for g in match.groups())
+    return (days * 24 + hours) * 60 + minutes
+
+
+def _leg(itinerary: Dict) -> Dict:
+    seg = itinerary["segments"]
+    return {
+        "airline": seg[0]["carrierCode"],
+        "departure": seg[0]["departure"]["iataCode"],
+        "arrival": seg[-1]["arrival"]["iataCode"],
+        "dep_time": seg[0]["departure"]["at"][11:16],
+        "arr_time": seg[-1]["arrival"]["at"][11:16],
+        "duration_min": duration_minutes(itinerary.get("duration", "")),
+        "stops": len(seg) - 1,
+    }
+
+
+def parse_offers(payload: Dict) -> List[Dict]:
+    """Every offer as {price, currency, outbound leg fields..., return_leg} with numeric price,
+    duration and stops. Offers missing required fields are skipped."""
+    records = []
+    for o in payload.get("data", []):
+        try:
+            legs = [_leg(i) for i in o["itineraries"]]
+            record = dict(legs[0], price=float(o["price"]["total"]), currency=o["price"]["currency"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+        if len(legs) > 1:
+            record["return_leg"] = legs[1]
+        records.append(record)
+    return records
+
+
+def rank_offers(
+    records: List[Dict],
+    top_k: int,
+    sort_by: str = "price",
+    non_stop: bool = False,
+    max_price: float = 0.0,
+) -> List[Dict]:
+    """The best `top_k` records ordered by `sort_by`, ties broken by the other RANK_KEYS.
+
+    Duration and stops count both legs of a round trip. The filters are applied again
+    here because cached candidates may come from a wider query.
+    """
+    if sort_by not in RANK_KEYS:
+        raise ValueError(f"sort_by must be one of {RANK_KEYS}, got '{sort_by}'")
+    if not records:
+        return []
+
+    n = len(records)
+    legs = [(r, r["return_leg"]) if "return_leg" in r else (r,) for r in records]
+    columns = {
+        "price": np.fromiter((r["price"] for r in records), dtype=float, count=n),
+        "duration": np.fromiter((sum(l["duration_min"] for l in ls) for ls in legs), dtype=float, count=n),
+        "stops": np.fromiter((sum(l["stops"] for l in ls) for ls in legs), dtype=int, count=n),
+    }
+    keep = np.ones(n, dtype=bool)
+    if non_stop:
+        keep &= columns["stops"] == 0
+    if max_price:
+        keep &= columns["price"] <= max_price
+
+    order = [sort_by] + [k for k in RANK_KEYS if k != sort_by]
+    # lexsort sorts by its last key first
+    index = np.lexsort([columns[k] for k in reversed(order)])
+    index = index[keep[index]][:max(0, int(top_k))]
+    return [records[i] for i in index]
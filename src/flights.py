@@ -0,0 +1,227 @@
+import asyncio
+from datetime import date, timedelta
+from typing import List, Optional
+
+import settings
+from amadeus_auth import token_manager
+from flight_cache import flight_cache, offer_key
+from flight_offers import TRAVEL_CLASSES, parse_offers, rank_offers
+from http_client import async_amadeus_client
+from iata_cache import iata_cache
+
+LOCATIONS_PATH = "/v1/reference-data/locations"
+OFFERS_PATH = "/v2/shopping/flight-offers"
+
+#   ========================= Amadeus helpers =========================
+
+async def _amadeus_aget(path: str, params: dict):
+    """GET an Amadeus endpoint through the shared httpx pool, renewing the token once on 401"""
+    r = await async_amadeus_client.get(path, token=await token_manager.aget_token(), params=params)
+    if r.status_code == 401:
+        token_manager.invalidate()
+        r = await async_amadeus_client.get(path, token=await token_manager.aget_token(), params=params)
+    return r
+
+def _location_params(city: str) -> dict:
+    return {
+        "keyword": city,
+        "subType": "CITY,AIRPORT",
+        "view": "LIGHT"
+    }
+
+def _pick_iata(city: str, data: list) -> Optional[str]:
+    """Prefer CITY over AIRPORT in a locations response"""
+    if not data:
+        print(f"[IATA Lookup] No results for '{city}'")
+        return None
+
+    for loc in data:
+        if loc.get("subType") == "CITY":
+            iata = loc["iataCode"]
+            print(f"[IATA Lookup] {city} → {iata} (CITY)")
+            return iata
+    # Fallback to first airport
+    iata = data[0]["iataCode"]
+    print(f"[IATA Lookup] {city} → {iata} (AIRPORT)")
+    return iata
+
+async def _afetch_iata(city: str):
+    """Live Amadeus lookup of city name → IATA code (city-level preferred).
+
+    None means Amadeus answered and knows no such place; transport, auth and server
+    errors raise instead, so they are never remembered as a negative entry.
+    """
+    r = await _amadeus_aget(LOCATIONS_PATH, _location_params(city))
+    r.raise_for_status()
+    return _pick_iata(city, r.json().get("data", []))
+
+def _clean_city(city: str) -> Optional[str]:
+    """Strip the input; returns the IATA code itself for inputs like "DEL", "" for unusable input, else None"""
+    city = (city or "").strip()
+    if len(city) == 3 and city.isalpha() and city.isupper():
+        return city  # already an IATA code
+    if len(city) < 2:
+        return ""
+    return None
+
+async def _aiata_lookup(city: str) -> str:
+    code = _clean_city(city)
+    if code is not None:
+        return code
+    city = city.strip()
+    found, code = iata_cache.get(city)
+    if not found:
+        try:
+            code = await _afetch_iata(city)
+        except Exception as e:
+            print(f"[IATA Lookup] Error for '{city}': {e}")
+            return ""  # not cached: the next lookup asks Amadeus again
+        iata_cache.put(city, code)
+    return code or ""
+
+async def resolve_cities(*cities: str) -> List[str]:
+    """IATA codes for several cities at once through the IATA cache, "" for unresolved ones."""
+    return list(await asyncio.gather(*(_aiata_lookup(c) for c in cities)))
+
+def _offer_params(origin_code, dest_code, departure_date, adults, return_date, currency, non_stop, max_price, travel_class) -> dict:
+    params = {
+        "originLocationCode": origin_code,
+        "destinationLocationCode": dest_code,
+        "departureDate": departure_date,
+        "adults": adults,
+        "currencyCode": currency,
+        "max": settings.FLIGHT_CANDIDATES
+    }
+    if return_date:
+        params["returnDate"] = return_date
+    if non_stop:
+        params["nonStop"] = "true"
+    if max_price:
+        params["maxPrice"] = int(max_price)
+    if travel_class:
+        params["travelClass"] = travel_class
+    return params
+
+def _filters(non_stop: bool, max_price: float, travel_class: str) -> tuple:
+    """Normalized server-side filters; raises ValueError for an unknown travel class."""
+    travel_class = (travel_class or "").strip().upper().replace(" ", "_")
+    if travel_class and travel_class not in TRAVEL_CLASSES:
+        raise ValueError(f"travel_class must be one of {TRAVEL_CLASSES}, got '{travel_class}'")
+    return bool(non_stop), max(0.0, float(max_price or 0)), travel_class
+
+def _ranked(candidates: list, max_results: int, sort_by: str, non_stop: bool, max_price: float) -> list:
+    if any("error" in r for r in candidates):
+        return candidates
+    return rank_offers(candidates, max_results, sort_by, non_stop, max_price) or [{"info": "No flights found"}]
+
+def _unresolved(origin, origin_code, destination, dest_code) -> list:
+    return [{"error": f"Could not resolve IATA code: origin='{origin}'→'{origin_code}', dest='{destination}'→'{dest_code}'"}]
+
+#   ========================= Flight search tools =========================
+
+async def _aoffers(origin_code, dest_code, departure_date, adults, return_date, currency, filters: tuple) -> list:
+    """Candidate offers for one Amadeus query, unranked; shared through the flight cache."""
+    query = (origin_code, dest_code, departure_date, adults, return_date, currency, *filters)
+
+    async def load() -> list:
+        r = await _amadeus_aget(OFFERS_PATH, _offer_params(*query))
+        if r.status_code != 200:
+            return [{"error": f"API {r.status_code}: {r.text[:100]}"}]
+
+        results = parse_offers(r.json())
+        print(f"[Flight Search] Found {len(results)} offers from {origin_code} to {dest_code} on {departure_date}")
+        return results
+
+    return await flight_cache.afetch(offer_key(*query), load)
+
+async def search_flights_async(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    adults: int = 1,
+    return_date: str = "",
+    currency: str = "INR",
+    max_results: int = 3,
+    non_stop: bool = False,
+    max_price: float = 0.0,
+    travel_class: str = "",
+    sort_by: str = "price"
+) -> list:
+    """Search flight offers between two cities; departure_date/return_date are YYYY-MM-DD.
+
+    Optional filters: non_stop, max_price (total, in `currency`), travel_class (ECONOMY,
+    PREMIUM_ECONOMY, BUSINESS or FIRST). Returns the best `max_results` offers ordered by
+    sort_by ("price", "duration" or "stops") with numeric price, duration_min and stops.
+    """
+    try:
+        filters = _filters(non_stop, max_price, travel_class)
+        # Both ends are resolved at once and nothing here blocks the event loop.
+        origin_code, dest_code = await asyncio.gather(_aiata_lookup(origin), _aiata_lookup(destination))
+        if len(origin_code) != 3 or len(dest_code) != 3:
+            return _unresolved(origin, origin_code, destination, dest_code)
+
+        candidates = await _aoffers(origin_code, dest_code, departure_date, adults, return_date, currency, filters)
+        return _ranked(candidates, max_results, sort_by, filters[0], filters[1])
+    except Exception as e:
+        return [{"error": str(e)}]
+
+async def search_flights_batch(queries: List[dict], concurrency: int = settings.FLIGHT_SEARCH_CONCURRENCY) -> List[list]:
+    """Run several `search_flights_async` keyword sets at once, at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(query: dict) -> list:
+        async with semaphore:
+            return await search_flights_async(**query)
+
+    return await asyncio.gather(*(run(q) for q in queries))
+
+async def search_flights_flexible(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    adults: int = 1,
+    return_date: str = "",
+    currency: str = "INR",
+    max_results: int = 3,
+    flex_days: int = 1,
+    non_stop: bool = False,
+    max_price: float = 0.0,
+    travel_class: str = "",
+    sort_by: str = "price"
+) -> list:
+    """Search the given dates and every shift of up to ±flex_days (trip length kept) in parallel.
+
+    Takes the same filters and sort_by as `search_flights_async`, applied per date.
+    """
+    try:
+        filters = _filters(non_stop, max_price, travel_class)
+        origin_code, dest_code = await asyncio.gather(_aiata_lookup(origin), _aiata_lookup(destination))
+        if len(origin_code) != 3 or len(dest_code) != 3:
+            return _unresolved(origin, origin_code, destination, dest_code)
+
+        start = date.fromisoformat(departure_date)
+        back = date.fromisoformat(return_date) if return_date else None
+        flex_days = max(0, min(int(flex_days), settings.FLIGHT_MAX_FLEX_DAYS))
+        variants = []
+        for shift in sorted(range(-flex_days, flex_days + 1), key=abs):
+            dep = start + timedelta(days=shift)
+            if dep < date.today():
+                continue
+            ret = (back + timedelta(days=shift)).isoformat() if back else ""
+            variants.append((dep.isoformat(), ret))
+
+        # Codes are already resolved, so only the offer queries fan out.
+        semaphore = asyncio.Semaphore(max(1, settings.FLIGHT_SEARCH_CONCURRENCY))
+
+        async def run(dep: str, ret: str) -> dict:
+            async with semaphore:
+                try:
+                    candidates = await _aoffers(origin_code, dest_code, dep, adults, ret, currency, filters)
+                    offers = _ranked(candidates, max_results, sort_by, filters[0], filters[1])
+                except Exception as e:
+                    offers = [{"error": str(e)}]
+            return {"departure_date": dep, "return_date": ret, "offers": offers}
+
+        return list(await asyncio.gather(*(run(dep, ret) for dep, ret in variants)))
+    except Exception as e:
+        return [{"error": str(e)}]
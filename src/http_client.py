@@ -0,0 +1,140 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+import settings
+import telemetry
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based), honouring Retry-After."""
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), settings.HTTP_BACKOFF_MAX)
+
+    backoff = settings.HTTP_BACKOFF_BASE * (2 ** attempt)
+    return min(backoff, settings.HTTP_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+class EndpointStats:
+    """Per-endpoint call, retry, error and latency counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int], retries: int) -> None:
+        with self._lock:
+            s = self._stats.setdefault(
+                endpoint, {"calls": 0, "errors": 0, "retries": 0, "total_s": 0.0, "max_s": 0.0}
+            )
+            s["calls"] += 1
+            s["retries"] += retries
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+            if status is None or status >= 400:
+                s["errors"] += 1
+        telemetry.http_call(endpoint, seconds, status, retries)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: dict(s, avg_s=round(s["total_s"] / s["calls"], 4) if s["calls"] else 0.0)
+                for name, s in self._stats.items()
+            }
+
+
+class AsyncAmadeusClient:
+    """Pooled keep-alive httpx client for the Amadeus API with retries on 429/5xx and network errors.
+
+    Used from coroutine tools, so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.AMADEUS_BASE_URL,
+        timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+        max_retries: int = settings.HTTP_MAX_RETRIES,
+        pool_size: int = settings.HTTP_POOL_SIZE,
+        stats: Optional[EndpointStats] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.max_retries = max_retries
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.stats = stats or EndpointStats()
+        # httpx pools are bound to the loop that opened them, so keep one per loop.
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def _session(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                # A pool whose loop has ended can no longer be closed from any loop;
+                # drop it so its sockets go with it instead of piling up.
+                for ended in [l for l in self._clients if l.is_closed()]:
+                    del self._clients[ended]
+                client = self._clients[loop] = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits)
+            return client
+
+    async def request(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures; non-retryable responses are returned as-is."""
+        endpoint = f"{method.upper()} {path.split('?')[0]}"
+        headers = dict(kwargs.pop("headers", None) or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        client = self._session()
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                r = await client.request(method, path, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    self.stats.record(endpoint, time.perf_counter() - start, None, attempt)
+                    raise
+                delay = retry_delay(attempt)
+                print(f"[HTTP] {endpoint} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            else:
+                if r.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    self.stats.record(endpoint, time.perf_counter() - start, r.status_code, attempt)
+                    return r
+                delay = retry_delay(attempt, r.headers.get("Retry-After"))
+                print(f"[HTTP] {endpoint} returned {r.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, path: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, token=token, **kwargs)
+
+    async def post(self, path: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, token=token, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool; call before that loop ends (e.g. at the end of asyncio.run)."""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# One pool per process so connections are kept alive across tool calls.
+amadeus_stats = EndpointStats()
+async_amadeus_client = AsyncAmadeusClient(stats=amadeus_stats)
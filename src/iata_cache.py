@@ -0,0 +1,142 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import settings
+import telemetry
+from iata_seed import SEED_IATA
+
+# What a cache lookup returns: (found, code). A found entry with code None is a
+# remembered failure, so the caller must not hit the network for it again.
+Lookup = Tuple[bool, Optional[str]]
+
+# Expired rows are deleted when the disk store opens and after every this many writes.
+PURGE_EVERY = 100
+
+
+def normalize_city(city: str) -> str:
+    """Cache key for a city name: lower case, single spaces."""
+    return re.sub(r"\s+", " ", (city or "").strip()).casefold()
+
+
+class IataDiskStore:
+    """SQLite table of resolved codes that survives restarts."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS iata (city TEXT PRIMARY KEY, code TEXT, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Tuple[Optional[str], float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT code, expires_at FROM iata WHERE city = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, code: Optional[str], expires_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO iata (city, code, expires_at) VALUES (?, ?, ?)", (key, code, expires_at)
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM iata WHERE expires_at < ?", (time.time(),)).rowcount
+
+
+class IataCache:
+    """Seed table -> in-process LRU -> SQLite, in that order, in front of the live lookup."""
+
+    def __init__(
+        self,
+        max_size: int = settings.IATA_CACHE_SIZE,
+        ttl: float = settings.IATA_TTL,
+        negative_ttl: float = settings.IATA_NEGATIVE_TTL,
+        db_path: Optional[str] = settings.IATA_CACHE_DB,
+        use_seed: bool = settings.IATA_USE_SEED,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.seed: Dict[str, str] = SEED_IATA if use_seed else {}
+        self._memory: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk: Optional[IataDiskStore] = None
+        self._writes = 0
+        if db_path:
+            try:
+                disk = IataDiskStore(db_path)
+                disk.purge_expired()
+                self.disk = disk
+            except (OSError, sqlite3.Error) as e:
+                print(f"[IATA Cache] Disk store unavailable ({e}), using memory only")
+        self.counters = {"seed": 0, "memory": 0, "disk": 0, "negative": 0, "miss": 0}
+
+    def get(self, city: str) -> Lookup:
+        key = normalize_city(city)
+        now = time.time()
+
+        code = self.seed.get(key) or self.seed.get(key.split(",")[0].strip())
+        if code:
+            self._count("seed")
+            return True, code
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.counters["memory" if entry[0] else "negative"] += 1
+                return True, entry[0]
+
+        if self.disk:
+            entry = self.disk.get(key)
+            if entry and entry[1] > now:
+                self._remember(key, entry[0], entry[1])
+                self._count("disk" if entry[0] else "negative")
+                return True, entry[0]
+
+        self._count("miss")
+        return False, None
+
+    def put(self, city: str, code: Optional[str]) -> None:
+        """Store a resolved code, or None for a city Amadeus does not know (kept for the shorter
+        negative TTL). Lookups that failed on the way (network, auth, 5xx) must not be stored."""
+        key = normalize_city(city)
+        expires_at = time.time() + (self.ttl if code else self.negative_ttl)
+        self._remember(key, code, expires_at)
+        if self.disk:
+            try:
+                self.disk.put(key, code, expires_at)
+                with self._lock:
+                    self._writes += 1
+                    purge = self._writes % PURGE_EVERY == 0
+                if purge:
+                    self.disk.purge_expired()
+            except sqlite3.Error as e:
+                print(f"[IATA Cache] Could not persist '{key}': {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, size=len(self._memory))
+
+    def _remember(self, key: str, code: Optional[str], expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (code, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+
+iata_cache = IataCache()
+telemetry.register_stats("iata_cache", iata_cache.stats)
@@ -0,0 +1,41 @@
+# Bundled city -> IATA table answered without any network call.
+# Metropolitan city codes (PAR, LON, NYC, ...) are used where Amadeus has one,
+# matching what the live lookup returns when it prefers CITY over AIRPORT.
+
+SEED_IATA = {
+    # India
+    "delhi": "DEL", "new delhi": "DEL", "mumbai": "BOM", "bombay": "BOM",
+    "bangalore": "BLR", "bengaluru": "BLR", "chennai": "MAA", "madras": "MAA",
+    "kolkata": "CCU", "calcutta": "CCU", "hyderabad": "HYD", "goa": "GOI",
+    "kochi": "COK", "cochin": "COK", "ahmedabad": "AMD", "pune": "PNQ",
+    "jaipur": "JAI", "lucknow": "LKO", "varanasi": "VNS", "amritsar": "ATQ",
+    "srinagar": "SXR", "leh": "IXL", "udaipur": "UDR", "coimbatore": "CJB",
+    "thiruvananthapuram": "TRV", "trivandrum": "TRV", "madurai": "IXM",
+    "bhubaneswar": "BBI", "guwahati": "GAU", "port blair": "IXZ",
+    "chandigarh": "IXC", "indore": "IDR", "nagpur": "NAG", "patna": "PAT",
+    "bagdogra": "IXB", "dehradun": "DED", "mangalore": "IXE", "vizag": "VTZ",
+    "visakhapatnam": "VTZ",
+    # Asia / Middle East
+    "dubai": "DXB", "abu dhabi": "AUH", "doha": "DOH", "singapore": "SIN",
+    "bangkok": "BKK", "phuket": "HKT", "kuala lumpur": "KUL", "bali": "DPS",
+    "denpasar": "DPS", "hong kong": "HKG", "tokyo": "TYO", "osaka": "OSA",
+    "seoul": "SEL", "beijing": "BJS", "shanghai": "SHA", "kathmandu": "KTM",
+    "colombo": "CMB", "male": "MLE", "maldives": "MLE", "dhaka": "DAC",
+    "istanbul": "IST",
+    # Europe
+    "paris": "PAR", "london": "LON", "rome": "ROM", "milan": "MIL",
+    "venice": "VCE", "florence": "FLR", "barcelona": "BCN", "madrid": "MAD",
+    "lisbon": "LIS", "amsterdam": "AMS", "brussels": "BRU", "frankfurt": "FRA",
+    "berlin": "BER", "munich": "MUC", "zurich": "ZRH", "geneva": "GVA",
+    "vienna": "VIE", "prague": "PRG", "budapest": "BUD", "athens": "ATH",
+    "nice": "NCE", "dublin": "DUB", "edinburgh": "EDI", "manchester": "MAN",
+    "copenhagen": "CPH", "stockholm": "STO", "oslo": "OSL", "helsinki": "HEL",
+    "moscow": "MOW",
+    # Americas / Oceania / Africa
+    "new york": "NYC", "washington": "WAS", "boston": "BOS", "chicago": "CHI",
+    "miami": "MIA", "las vegas": "LAS", "los angeles": "LAX",
+    "san francisco": "SFO", "toronto": "YTO", "vancouver": "YVR",
+    "sydney": "SYD", "melbourne": "MEL", "auckland": "AKL", "cairo": "CAI",
+    "cape town": "CPT", "johannesburg": "JNB", "nairobi": "NBO",
+    "mauritius": "MRU",
+}
@@ -0,0 +1,142 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Collection, Dict, Optional, Sequence
+
+from google.genai import types
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+
+import settings
+import telemetry
+
+# (while running, once done) labels shown to the user for each agent.
+STAGE_LABELS = {
+    "QueryParser": ("Understanding your trip", "Trip details understood"),
+    "CoordinatorAgent": ("Understanding your trip", "Trip details understood"),
+    "FlightAgent": ("Searching flights", "Flights found"),
+    "ActivityAgent": ("Finding activities", "Activities found"),
+    "CollabAgent": ("Drafting your plan", "Trip plan drafted"),
+    "WebView": ("Rendering your plan", "Page rendered"),
+    "ui_agents": ("Polishing the design", "Design polished"),
+    "optimizer": ("Running final checks", "Final checks done"),
+    "HtmlRender": ("Rendering your plan", "Page rendered"),
+    "TemplateRender": ("Rendering your plan", "Page rendered"),
+    "rootAgent": ("Reusing a saved plan", "Saved plan reused"),
+}
+
+# Agents whose streamed text is worth showing while it is written: the plan draft,
+# not the HTML stages.
+DRAFT_AUTHORS = ("CollabAgent",)
+
+
+@dataclass
+class Progress:
+    """One update pushed to the UI while a plan is being generated."""
+    kind: str  # "stage_started", "stage_done" or "partial"
+    author: str
+    label: str = ""
+    text: str = ""
+
+
+@dataclass
+class PipelineResult:
+    final_text: str
+    elapsed: float
+    tokens_in: int = 0
+    tokens_out: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+ProgressCallback = Callable[[Progress], Awaitable[None]]
+
+
+async def ensure_session(runner: Runner, user_id: str, session_id: str) -> None:
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    if not session:
+        await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+
+
+async def run_pipeline(
+    runner: Runner,
+    query: str,
+    user_id: str = "debug_user_id",
+    session_id: str = "debug_session_id",
+    on_progress: Optional[ProgressCallback] = None,
+    stream: bool = settings.STREAM_EVENTS,
+    discard_session: bool = False,
+    state_keys: Sequence[str] = (),
+    partial_authors: Collection[str] = (),
+) -> PipelineResult:
+    """Run the agent graph over the runner's event iterator, reporting progress as events arrive.
+
+    Only what the final output needs is kept: the last complete text, token
+    counts and per-stage timings. Events are dropped as soon as they are seen.
+    With `discard_session` the session is deleted afterwards, for one-shot
+    sessions that should not pile up in the session service. `state_keys` are
+    copied out of the session state into the result before that happens.
+    Streamed text is accumulated and reported only for `partial_authors`; the
+    chunks of every other agent are dropped on arrival.
+    """
+    await ensure_session(runner, user_id, session_id)
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE)
+    message = types.Content(role="user", parts=[types.Part(text=query)])
+
+    start = time.perf_counter()
+    final_text = ""
+    tokens_in = tokens_out = 0
+    # A stage is timed from the last completed response before its first event (the
+    # previous stage finishing) to its own last event, so one-event stages are not 0s.
+    first_seen: Dict[str, float] = {}
+    last_seen: Dict[str, float] = {}
+    boundary = start
+    partial: Dict[str, str] = {}
+    state: Dict[str, Any] = {}
+
+    with telemetry.plan_span(runner.app_name) as span:
+        try:
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message, run_config=run_config):
+                author = event.author
+                now = time.perf_counter()
+                if author not in first_seen:
+                    first_seen[author] = boundary
+                    if on_progress and author in STAGE_LABELS:
+                        await on_progress(Progress("stage_started", author, STAGE_LABELS[author][0]))
+                last_seen[author] = now
+
+                text = "".join(p.text for p in (event.content.parts if event.content and event.content.parts else []) if p.text)
+                if event.partial:
+                    # SSE chunks are deltas; the complete text arrives again in the closing event.
+                    if text and on_progress and author in partial_authors:
+                        partial[author] = partial.get(author, "") + text
+                        await on_progress(Progress("partial", author, STAGE_LABELS.get(author, ("", ""))[0], partial[author]))
+                    continue
+
+                partial.pop(author, None)
+                if event.usage_metadata:
+                    tokens_in += event.usage_metadata.prompt_token_count or 0
+                    tokens_out += event.usage_metadata.candidates_token_count or 0
+                if text:
+                    final_text = text
+                if event.is_final_response():
+                    boundary = now
+                    if on_progress and author in STAGE_LABELS:
+                        await on_progress(Progress("stage_done", author, STAGE_LABELS[author][1], text))
+        finally:
+            if state_keys:
+                session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+                state = {k: session.state.get(k) for k in state_keys if session and session.state.get(k) is not None}
+            if discard_session:
+                await runner.session_service.delete_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+        if span is not None:
+            span.set_attributes({"llm.tokens.input": tokens_in, "llm.tokens.output": tokens_out})
+
+    return PipelineResult(
+        final_text=final_text,
+        elapsed=time.perf_counter() - start,
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        stage_seconds={a: round(last_seen[a] - first_seen[a], 3) for a in first_seen},
+        state=state,
+    )
@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import settings
+import telemetry
+
+# Session state saved with a plan; "activities" alone is reusable when only the dates moved.
+PLAN_KEYS = ("trip_details", "flights", "activities", "trip_plan", "final_ui")
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def _iso_date(value) -> str:
+    text = str(value or "").strip()
+    try:
+        return date.fromisoformat(text[:10]).isoformat()
+    except ValueError:
+        return text.casefold()
+
+
+def _words(value) -> str:
+    return " ".join(re.sub(r"\s+", " ", str(value or "")).strip().casefold().split())
+
+
+def normalize_trip_details(details: Dict) -> Dict:
+    """The fields of a CoordinatorAgent dict that decide whether two trips are the same."""
+    prefs = re.split(r"\s*(?:,|;|/|\band\b)\s*", _words(details.get("other_preferences")))
+    days = _number(details.get("days_of_stay"))
+    return {
+        "origin": _words(details.get("origin")),
+        "destination": _words(details.get("destination")),
+        "days_of_stay": int(days) if days is not None else None,
+        "preferences": ",".join(sorted({p for p in prefs if p and p not in ("none", "n/a", "na")})),
+        "budget": _number(details.get("budget")),
+        "departure_date": _iso_date(details.get("departure_date")),
+    }
+
+
+def _base_key(normalized: Dict, render_mode: str) -> str:
+    return "|".join([
+        normalized["origin"], normalized["destination"], str(normalized["days_of_stay"]),
+        normalized["preferences"], render_mode,
+    ])
+
+
+@dataclass
+class CachedPlan:
+    base: str
+    budget: Optional[float]
+    departure_date: str
+    state: Dict[str, object]
+    created_at: float = field(default_factory=time.time)
+    id: Optional[int] = None
+
+
+class PlanCache:
+    """Bounded LRU of finished plans, mirrored to SQLite, matched with budget/date tolerance."""
+
+    def __init__(
+        self,
+        max_size: int = settings.PLAN_CACHE_SIZE,
+        ttl: float = settings.PLAN_CACHE_TTL,
+        budget_tolerance: float = settings.PLAN_CACHE_BUDGET_TOLERANCE,
+        date_tolerance_days: int = settings.PLAN_CACHE_DATE_TOLERANCE_DAYS,
+        db_path: Optional[str] = settings.PLAN_CACHE_DB,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.budget_tolerance = budget_tolerance
+        self.date_tolerance_days = date_tolerance_days
+        self._plans: "OrderedDict[int, CachedPlan]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.counters = {"lookups": 0, "full_hits": 0, "partial_hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        if db_path:
+            try:
+                self._open(db_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Plan Cache] Disk store unavailable ({e}), using memory only")
+                self._conn = None
+
+    def _open(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans (id INTEGER PRIMARY KEY, base TEXT NOT NULL, budget REAL,"
+                " departure_date TEXT NOT NULL, state TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM plans WHERE created_at < ?", (time.time() - self.ttl,))
+        rows = self._conn.execute(
+            "SELECT id, base, budget, departure_date, state, created_at FROM plans ORDER BY created_at DESC LIMIT ?",
+            (self.max_size,),
+        ).fetchall()
+        for row in reversed(rows):
+            self._plans[row[0]] = CachedPlan(row[1], row[2], row[3], json.loads(row[4]), row[5], row[0])
+        self._next_id = max(self._plans, default=0) + 1
+
+    def _budget_close(self, a: Optional[float], b: Optional[float]) -> bool:
+        if a is None or b is None:
+            return a is None and b is None
+        return abs(a - b) <= self.budget_tolerance * max(a, b)
+
+    def _date_close(self, a: str, b: str) -> bool:
+        if a == b:
+            return True
+        try:
+            return abs((date.fromisoformat(a) - date.fromisoformat(b)).days) <= self.date_tolerance_days
+        except ValueError:
+            return False
+
+    def lookup(self, details: Dict, render_mode: str) -> Tuple[str, Optional[CachedPlan]]:
+        """("full", plan) when the whole plan can be reused, ("partial", plan) when only its
+        activities can (same trip, other dates), else ("miss", None)."""
+        normalized = normalize_trip_details(details)
+        base = _base_key(normalized, render_mode)
+        now = time.time()
+        best: Tuple[str, Optional[CachedPlan]] = ("miss", None)
+        with self._lock:
+            self.counters["lookups"] += 1
+            for plan in reversed(self._plans.values()):
+                if plan.base != base or now - plan.created_at > self.ttl:
+                    continue
+                if not self._budget_close(plan.budget, normalized["budget"]):
+                    continue
+                if self._date_close(plan.departure_date, normalized["departure_date"]):
+                    best = ("full", plan)
+                    break
+                if best[1] is None and plan.state.get("activities"):
+                    best = ("partial", plan)
+
+            level, plan = best
+            self.counters[{"full": "full_hits", "partial": "partial_hits", "miss": "misses"}[level]] += 1
+            if plan is not None:
+                self._plans.move_to_end(plan.id)
+        return best
+
+    def store(self, details: Dict, render_mode: str, state: Dict) -> None:
+        normalized = normalize_trip_details(details)
+        plan = CachedPlan(
+            base=_base_key(normalized, render_mode),
+            budget=normalized["budget"],
+            departure_date=normalized["departure_date"],
+            state={k: state.get(k) for k in PLAN_KEYS if state.get(k) is not None},
+        )
+        evicted = []
+        with self._lock:
+            plan.id = self._next_id
+            self._next_id += 1
+            self._plans[plan.id] = plan
+            self.counters["stored"] += 1
+            while len(self._plans) > self.max_size:
+                evicted.append(self._plans.popitem(last=False)[0])
+                self.counters["evicted"] += 1
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT INTO plans (id, base, budget, departure_date, state, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                            (plan.id, plan.base, plan.budget, plan.departure_date, json.dumps(plan.state, default=str), plan.created_at),
+                        )
+                        self._conn.executemany("DELETE FROM plans WHERE id = ?", [(i,) for i in evicted])
+                except sqlite3.Error as e:
+                    print(f"[Plan Cache] Could not persist plan: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.counters["lookups"]
+            hits = self.counters["full_hits"] + self.counters["partial_hits"]
+            return dict(self.counters, size=len(self._plans), hit_rate=round(hits / lookups, 3) if lookups else 0.0)
+
+
+plan_cache = PlanCache()
+telemetry.register_stats("plan_cache", plan_cache.stats)
@@ -0,0 +1,150 @@
+import atexit
+import gzip
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import settings
+import telemetry
+
+
+class PlanStore:
+    """Generated HTML plans: the newest few in memory, older ones gzipped to disk.
+
+    Every process writes under its own run directory inside `root`, which is removed
+    at exit. Run directories and files older than `max_age` are swept on startup and
+    as new plans come in, so crashed runs do not leave files behind either.
+    """
+
+    def __init__(
+        self,
+        memory_size: int = settings.PLAN_STORE_MEMORY,
+        root: str = settings.PLAN_STORE_DIR,
+        max_age: float = settings.PLAN_STORE_MAX_AGE,
+    ):
+        self.memory_size = max(1, memory_size)
+        self.root = root
+        self.max_age = max_age
+        self._memory: "OrderedDict[int, str]" = OrderedDict()
+        self._html_paths: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._dir: Optional[str] = None
+        self._last_sweep = 0.0
+        self.counters = {"added": 0, "spilled": 0, "disk_reads": 0, "files_written": 0, "files_reused": 0, "expired": 0}
+        atexit.register(self.close)
+
+    def _run_dir(self) -> str:
+        if self._dir is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._sweep_runs()
+            self._dir = tempfile.mkdtemp(prefix=f"run-{os.getpid()}-", dir=self.root)
+        return self._dir
+
+    def _sweep_runs(self) -> None:
+        cutoff = time.time() - self.max_age
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if name.startswith("run-") and path != self._dir and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _spill_path(self, plan_id: int) -> str:
+        return os.path.join(self._run_dir(), f"plan-{plan_id}.html.gz")
+
+    def add(self, html: str) -> int:
+        """Keep a plan and return its id for `get` / `html_path`."""
+        with self._lock:
+            plan_id = next(self._ids)
+            self._memory[plan_id] = html
+            self.counters["added"] += 1
+            while len(self._memory) > self.memory_size:
+                old_id, old_html = self._memory.popitem(last=False)
+                if old_id not in self._html_paths:
+                    # Plans already written out for the browser are read back from that file instead.
+                    with gzip.open(self._spill_path(old_id), "wt", encoding="utf-8") as f:
+                        f.write(old_html)
+                self.counters["spilled"] += 1
+            self._expire()
+        return plan_id
+
+    def get(self, plan_id: int) -> Optional[str]:
+        with self._lock:
+            if plan_id in self._memory:
+                self._memory.move_to_end(plan_id)
+                return self._memory[plan_id]
+            try:
+                if plan_id in self._html_paths:
+                    with open(self._html_paths[plan_id], encoding="utf-8") as f:
+                        html = f.read()
+                else:
+                    with gzip.open(self._spill_path(plan_id), "rt", encoding="utf-8") as f:
+                        html = f.read()
+            except OSError:
+                return None  # expired or never stored
+            self.counters["disk_reads"] += 1
+            return html
+
+    def html_path(self, plan_id: int) -> Optional[str]:
+        """A plain .html file for the plan, written on first use and reused afterwards."""
+        with self._lock:
+            path = self._html_paths.get(plan_id)
+            if path and os.path.exists(path):
+                self.counters["files_reused"] += 1
+                os.utime(path)  # opened again, so keep it past the age sweep
+                return path
+        html = self.get(plan_id)
+        if html is None:
+            return None
+        with self._lock:
+            path = os.path.join(self._run_dir(), f"plan-{plan_id}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+            self._html_paths[plan_id] = path
+            self.counters["files_written"] += 1
+            try:
+                os.remove(self._spill_path(plan_id))
+            except OSError:
+                pass
+        return path
+
+    def _expire(self) -> None:
+        # Called with the lock held; at most once a minute.
+        now = time.time()
+        if self._dir is None or now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        cutoff = now - self.max_age
+        for entry in os.scandir(self._dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    self.counters["expired"] += 1
+            except OSError:
+                pass
+        self._html_paths = {i: p for i, p in self._html_paths.items() if os.path.exists(p)}
+        self._sweep_runs()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            files = len(os.listdir(self._dir)) if self._dir and os.path.isdir(self._dir) else 0
+            return dict(self.counters, in_memory=len(self._memory), files_on_disk=files)
+
+    def close(self) -> None:
+        """Remove this process's files; plans still in memory are simply dropped."""
+        with self._lock:
+            if self._dir:
+                shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+            self._html_paths.clear()
+
+
+plan_store = PlanStore()
+telemetry.register_stats("plan_store", plan_store.stats)
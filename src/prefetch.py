@@ -0,0 +1,190 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import settings
+import telemetry
+from trip_parser import parse_trip_query
+
+# Speculative cache warming from the chat box, before the query is even sent.
+#
+# Each window owns a Prefetcher. Edits are debounced; once the user pauses, the text is
+# parsed locally and the route it names (origin, destination, dates, adults) is looked
+# up the way FlightAgent will look it up, so the Amadeus token, IATA codes and flight
+# offers are already cached when the pipeline reaches them. A prefetch for a route the
+# user has typed over is cancelled. All windows share one rate budget.
+
+# (origin, destination, departure_date, return_date, adults); no dates = cities only
+Target = Tuple[str, str, str, str, int]
+
+# FlightAgent searches for 2 adults unless the query says otherwise.
+DEFAULT_ADULTS = 2
+_ADULTS = re.compile(r"(\d+)\s+adults")
+
+
+def prefetch_target(text: str) -> Optional[Target]:
+    """The route a half-typed query names, or None while it names no two cities."""
+    details, _ = parse_trip_query(text)
+    origin, destination = details["origin"], details["destination"]
+    # Cut-off words ("Go" on the way to "Goa") are not worth an Amadeus lookup
+    if len(origin) < 3 or len(destination) < 3:
+        return None
+    adults = _ADULTS.search(details["other_preferences"])
+    return (
+        origin.casefold(),
+        destination.casefold(),
+        details["departure_date"],
+        details["return_date"],
+        int(adults.group(1)) if adults else DEFAULT_ADULTS,
+    )
+
+
+class TokenBucket:
+    """`rate` prefetches per minute, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class PrefetchStats:
+    """How often a sent query found its route warmed by a prefetch (or one in flight)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.throttled = 0
+        self.submitted = 0
+        self.hits = 0
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "started": self.started,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "throttled": self.throttled,
+                "submitted": self.submitted,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.submitted, 3) if self.submitted else 0.0,
+            }
+
+
+prefetch_budget = TokenBucket(settings.PREFETCH_RATE, settings.PREFETCH_BURST)
+prefetch_stats = PrefetchStats()
+telemetry.register_stats("prefetch", prefetch_stats.snapshot)
+
+
+class Prefetcher:
+    """Debounced prefetch for one chat box. Every method runs on the page's event loop."""
+
+    def __init__(self, debounce: float = settings.PREFETCH_DEBOUNCE, ttl: float = settings.FLIGHT_CACHE_TTL, remember: int = 32):
+        self.debounce = debounce
+        self.ttl = ttl  # a warmed route counts as warm only while its offers stay cached
+        self.remember = remember
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._task_target: Optional[Target] = None
+        # Route -> monotonic time, oldest first: routes a prefetch warmed, and routes
+        # already sent (their plan fetches them itself, so they are not prefetched again)
+        self._warm: "OrderedDict[Target, float]" = OrderedDict()
+        self._sent: "OrderedDict[Target, float]" = OrderedDict()
+
+    async def text_changed(self, text: str) -> None:
+        """Call on every edit; only the text the user pauses on is looked at."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.debounce, self._start, text)
+
+    async def submitted(self, text: str) -> None:
+        """Call when the query is sent, before its plan starts; records a hit or a miss."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        target = prefetch_target(text)
+        hit = target is not None and (self._fresh(self._warm, target) or self._in_flight(target))
+        prefetch_stats.count("submitted")
+        if hit:
+            prefetch_stats.count("hits")
+        if target is not None:
+            # The plan may share the running prefetch's Amadeus call, so it is never
+            # cancelled from here on, and the route is not prefetched again.
+            self._remember(self._sent, target)
+        self._task, self._task_target = None, None
+        print(f"[Prefetch] {'hit' if hit else 'miss'} | {prefetch_stats.snapshot()}")
+
+    def _start(self, text: str) -> None:
+        self._timer = None
+        target = prefetch_target(text)
+        if target is None or self._in_flight(target) or self._fresh(self._warm, target) or self._fresh(self._sent, target):
+            return
+        if self._task is not None and not self._task.done():
+            self._task.cancel()  # the user has typed over that route
+            prefetch_stats.count("cancelled")
+        self._task, self._task_target = None, None
+        if not prefetch_budget.take():
+            prefetch_stats.count("throttled")
+            return
+        prefetch_stats.count("started")
+        self._task, self._task_target = asyncio.create_task(self._warm_route(target)), target
+
+    async def _warm_route(self, target: Target) -> None:
+        # Imported here so the app does not load the HTTP clients before credentials exist
+        from amadeus_auth import token_manager
+        from flights import resolve_cities, search_flights_async
+
+        origin, destination, departure_date, return_date, adults = target
+        try:
+            await token_manager.aget_token()
+            if departure_date:
+                offers = await search_flights_async(origin, destination, departure_date, adults=adults, return_date=return_date)
+                ok = not any("error" in o for o in offers)
+            else:
+                ok = all(await resolve_cities(origin, destination))
+        except Exception as e:
+            print(f"[Prefetch] {origin} → {destination} failed: {e}")
+            ok = False
+        prefetch_stats.count("completed" if ok else "failed")
+        if ok:
+            self._remember(self._warm, target)
+            print(f"[Prefetch] warmed {origin} → {destination} {departure_date or '(cities only)'}")
+
+    def _in_flight(self, target: Target) -> bool:
+        return self._task is not None and not self._task.done() and target == self._task_target
+
+    def _fresh(self, routes: "OrderedDict[Target, float]", target: Target) -> bool:
+        at = routes.get(target)
+        if at is not None and time.monotonic() - at >= self.ttl:
+            del routes[target]
+            return False
+        return at is not None
+
+    def _remember(self, routes: "OrderedDict[Target, float]", target: Target) -> None:
+        routes[target] = time.monotonic()
+        routes.move_to_end(target)
+        while len(routes) > self.remember:
+            routes.popitem(last=False)
@@ -0,0 +1,250 @@
+import html
+import json
+import re
+import threading
+from string import Template
+from typing import Dict, List, Optional
+
+from schemas import ActivityPlan, FlightLeg, FlightOptions, StageOutputError, parse_stage_output
+
+# chain    - WebView -> ui_agents -> optimizer, three LLM calls (original behaviour)
+# single   - one LLM call turns the trip plan straight into the final HTML
+# template - no LLM call, the page is built locally from session state
+RENDER_MODES = ("chain", "single", "template")
+
+#   ========================= Local HTML template =========================
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title</title>
+<style>
+  body { margin: 0; font-family: "Segoe UI", Roboto, Arial, sans-serif; background: #f4f1fb; color: #1f1b2e; }
+  header { background: linear-gradient(135deg, #5b2a86, #1e88e5); color: #fff; padding: 40px 24px; text-align: center; }
+  header h1 { margin: 0 0 8px; font-size: 2.2rem; }
+  header p { margin: 0; opacity: .9; }
+  main { max-width: 960px; margin: -24px auto 40px; padding: 0 16px; }
+  section { background: #fff; border-radius: 16px; box-shadow: 0 6px 24px rgba(40, 20, 80, .12); padding: 24px 28px; margin-bottom: 20px; }
+  h2 { color: #5b2a86; border-bottom: 2px solid #ede7f6; padding-bottom: 6px; }
+  h3 { color: #1e88e5; }
+  table { width: 100%; border-collapse: collapse; margin: 12px 0; }
+  th { background: #5b2a86; color: #fff; text-align: left; }
+  th, td { padding: 10px 12px; border-bottom: 1px solid #ede7f6; vertical-align: top; }
+  tr:nth-child(even) td { background: #faf8ff; }
+  ul, ol { padding-left: 22px; }
+  li { margin: 4px 0; }
+  code { background: #ede7f6; padding: 1px 5px; border-radius: 4px; }
+  .facts { display: flex; flex-wrap: wrap; gap: 10px; justify-content: center; margin-top: 16px; }
+  .facts span { background: rgba(255, 255, 255, .18); border-radius: 20px; padding: 6px 14px; }
+  .note { color: #6b6482; font-size: .95rem; }
+</style>
+</head>
+<body>
+<header>
+  <h1>$title</h1>
+  <p>$subtitle</p>
+  <div class="facts">$facts</div>
+</header>
+<main>
+$sections
+</main>
+</body>
+</html>
+""")
+
+
+def parse_state_value(value) -> Optional[dict]:
+    """Best-effort dict out of an agent output: a dict, JSON, or JSON inside a ``` fence."""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"\{.*\}", value, re.S)
+    if not match:
+        return None
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)", r"<em>\1</em>", text)
+    text = re.sub(r"\[([^\]]+)\]\((https?://[^)\s]+)\)", r'<a href="\2" target="_blank">\1</a>', text)
+    return text
+
+
+def _table(rows) -> str:
+    cells = [[c.strip() for c in row.strip().strip("|").split("|")] for row in rows]
+    head, body = cells[0], [r for r in cells[1:] if not all(re.fullmatch(r":?-{2,}:?", c) for c in r)]
+    out = ["<table><thead><tr>", *(f"<th>{_inline(c)}</th>" for c in head), "</tr></thead><tbody>"]
+    for row in body:
+        out.append("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in row) + "</tr>")
+    out.append("</tbody></table>")
+    return "".join(out)
+
+
+def markdown_to_html(text: str) -> str:
+    """Small Markdown subset (headings, lists, tables, emphasis, links) - what the CollabAgent writes."""
+    out, para, lines = [], [], (text or "").replace("\r\n", "\n").split("\n")
+    list_tag = None
+
+    def flush():
+        nonlocal list_tag
+        if para:
+            out.append(f"<p>{_inline(' '.join(para))}</p>")
+            para.clear()
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if line.startswith("|"):
+            flush()
+            rows = []
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(lines[i])
+                i += 1
+            out.append(_table(rows))
+            continue
+
+        heading = re.match(r"(#{1,6})\s+(.*)", line)
+        bullet = re.match(r"[-*+]\s+(.*)", line)
+        numbered = re.match(r"\d+[.)]\s+(.*)", line)
+        if not line:
+            flush()
+        elif re.fullmatch(r"(-{3,}|\*{3,}|_{3,})", line):
+            flush()
+            out.append("<hr>")
+        elif heading:
+            flush()
+            level = min(len(heading.group(1)) + 1, 6)  # the page title is the only h1
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif bullet or numbered:
+            tag = "ul" if bullet else "ol"
+            if para or list_tag != tag:
+                flush()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{_inline((bullet or numbered).group(1))}</li>")
+        else:
+            if list_tag:
+                flush()
+            para.append(line)
+        i += 1
+    flush()
+    return "\n".join(out)
+
+
+def _rows(head: List[str], rows: List[List[str]]) -> str:
+    """HTML table from already escaped cells."""
+    out = ["<table><thead><tr>", *(f"<th>{c}</th>" for c in head), "</tr></thead><tbody>"]
+    out += ["<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows]
+    out.append("</tbody></table>")
+    return "".join(out)
+
+
+def _leg(leg: FlightLeg) -> str:
+    stops = "non-stop" if leg.stops == 0 else f"{leg.stops} stop{'s' if leg.stops > 1 else ''}"
+    duration = f", {leg.duration_min // 60}h {leg.duration_min % 60:02d}m" if leg.duration_min else ""
+    route = " ".join(p for p in (leg.airline, leg.departure, leg.dep_time, "→", leg.arrival, leg.arr_time) if p)
+    return html.escape(f"{route} ({stops}{duration})")
+
+
+def _flights_html(value) -> str:
+    """Offer table from the FlightAgent's FlightOptions, cheapest first; "" if there is none."""
+    try:
+        options = parse_stage_output(FlightOptions, value)
+    except StageOutputError:
+        return ""
+    note = f'<p class="note">{html.escape(options.note)}</p>' if options.note else ""
+    if not options.offers:
+        return f"<h2>Flights</h2>{note}" if note else ""
+    offers = sorted(options.offers, key=lambda o: o.price)
+    round_trip = any(o.return_leg for o in offers)
+    head = ["Outbound", *(["Return"] if round_trip else []), "Price"]
+    rows = [
+        [_leg(o), *([_leg(o.return_leg) if o.return_leg else "–"] if round_trip else []), html.escape(f"{o.currency} {o.price:,.0f}".strip())]
+        for o in offers
+    ]
+    return f"<h2>Flights</h2>{_rows(head, rows)}{note}"
+
+
+def _activities_html(value) -> str:
+    """Day-by-day table from the ActivityAgent's ActivityPlan; "" if there is none."""
+    try:
+        plan = parse_stage_output(ActivityPlan, value)
+    except StageOutputError:
+        return ""
+    if not plan.days:
+        return ""
+    costs = any(d.estimated_cost is not None for d in plan.days)
+    head = ["Day", "Morning", "Afternoon", "Evening", *(["Est. cost"] if costs else [])]
+    rows = [
+        [str(d.day), _inline(d.morning), _inline(d.afternoon), _inline(d.evening),
+         *([f"{d.estimated_cost:,.0f}" if d.estimated_cost is not None else "–"] if costs else [])]
+        for d in sorted(plan.days, key=lambda d: d.day)
+    ]
+    return f"<h2>Day by day</h2>{_rows(head, rows)}"
+
+
+def render_plan_html(state: Dict) -> str:
+    """Final HTML page built from session state without any LLM call.
+
+    Flights and activities are tabulated from their structured state; the CollabAgent's
+    Markdown plan follows for the tips and the cost breakdown.
+    """
+    details = parse_state_value(state.get("trip_details")) or {}
+    destination = str(details.get("destination") or "").strip()
+    origin = str(details.get("origin") or "").strip()
+
+    facts = []
+    for label, key in (("Days", "days_of_stay"), ("Budget", "budget"), ("Departs", "departure_date"), ("Returns", "return_date")):
+        if details.get(key):
+            facts.append(f"<span>{label}: {html.escape(str(details[key]))}</span>")
+
+    sections = [_flights_html(state.get("flights")), _activities_html(state.get("activities"))]
+    sections.append(markdown_to_html(str(state.get("trip_plan") or "")))
+    sections = [f"<section>\n{body}\n</section>" for body in sections if body]
+    if not sections:
+        sections = ["<section>\n<p>No trip plan was generated.</p>\n</section>"]
+
+    return PAGE.substitute(
+        title=html.escape(f"Trip to {destination}" if destination else "Your Trip Plan"),
+        subtitle=html.escape(f"From {origin}" if origin else "Planned by TripWise"),
+        facts="".join(facts),
+        sections="\n".join(sections),
+    )
+
+#   ========================= Mode comparison =========================
+
+_lock = threading.Lock()
+_runs: Dict[str, Dict[str, float]] = {}
+
+
+def record_run(mode: str, seconds: float, tokens_in: int, tokens_out: int) -> None:
+    """Log one finished plan and the running per-mode averages for comparison."""
+    with _lock:
+        s = _runs.setdefault(mode, {"runs": 0, "seconds": 0.0, "tokens_in": 0, "tokens_out": 0})
+        s["runs"] += 1
+        s["seconds"] += seconds
+        s["tokens_in"] += tokens_in
+        s["tokens_out"] += tokens_out
+        summary = ", ".join(
+            f"{m}: {v['seconds'] / v['runs']:.1f}s {v['tokens_in'] // v['runs']}/{v['tokens_out'] // v['runs']} tok"
+            for m, v in _runs.items()
+        )
+    print(f"[Render] mode={mode} took {seconds:.1f}s, tokens in/out {tokens_in}/{tokens_out} | avg {summary}")
+
+
+def render_stats() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        return {m: dict(v) for m, v in _runs.items()}
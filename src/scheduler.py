@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import settings
+import telemetry
+
+
+class QueueFullError(RuntimeError):
+    """Raised by `submit` when every worker is busy and the queue is at its limit."""
+
+
+class JobCancelledError(Exception):
+    """The job was cancelled, usually because the same owner submitted a newer one."""
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    run: Callable[[], Awaitable[Any]]
+    future: "asyncio.Future[Any]"
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    task: Optional["asyncio.Task[Any]"] = None
+
+    async def result(self) -> Any:
+        return await self.future
+
+
+class RequestScheduler:
+    """Bounded worker pool with a bounded queue for pipeline runs, shared by every page/user."""
+
+    def __init__(
+        self,
+        workers: int = settings.PLAN_WORKERS,
+        max_queue: int = settings.PLAN_QUEUE_SIZE,
+        cancel_superseded: bool = settings.CANCEL_SUPERSEDED,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.cancel_superseded = cancel_superseded
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker_tasks: List["asyncio.Task[None]"] = []
+        self._latest: Dict[str, Job] = {}  # owner -> newest unfinished job
+        self._ids = itertools.count(1)
+        self._running = 0
+        self._waits: Deque[float] = deque(maxlen=200)
+        self._runs: Deque[float] = deque(maxlen=200)
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def _start(self) -> "asyncio.Queue[Job]":
+        # Workers live on the loop of the first caller (Flet's, uvicorn's, ...).
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    def submit(self, owner: str, run: Callable[[], Awaitable[Any]]) -> Job:
+        """Queue `run()` for `owner`; await `job.result()` for its return value."""
+        queue = self._start()
+        if queue.full():
+            self.counters["rejected"] += 1
+            raise QueueFullError(f"{self.workers} plans running and {queue.qsize()} waiting, try again shortly")
+        if self.cancel_superseded and owner in self._latest:
+            self.cancel(owner)
+
+        job = Job(id=f"job-{next(self._ids)}", owner=owner, run=run, future=asyncio.get_running_loop().create_future())
+        queue.put_nowait(job)
+        self._latest[owner] = job
+        self.counters["submitted"] += 1
+        return job
+
+    def cancel(self, owner: str, job: Optional[Job] = None) -> bool:
+        """Cancel `job`, or the owner's newest one, whether it is still queued or already running."""
+        latest = self._latest.get(owner)
+        job = job or latest
+        if job is None or job.future.done():
+            return False
+        if job is latest:
+            del self._latest[owner]
+        if job.task is not None:
+            job.task.cancel()
+        self._finish(job, error=JobCancelledError(f"{job.id} was superseded or cancelled"))
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.future.done():
+                    continue  # cancelled while it was waiting
+                job.started_at = time.perf_counter()
+                self._waits.append(job.started_at - job.enqueued_at)
+                job.task = asyncio.create_task(job.run())
+                self._running += 1
+                try:
+                    result = await job.task
+                except asyncio.CancelledError:
+                    self._finish(job, error=JobCancelledError(f"{job.id} was cancelled"))
+                    # Cancelling the worker also cancels the job it awaits; only the
+                    # worker's own cancellation (shutdown) should stop the loop.
+                    worker = asyncio.current_task()
+                    if worker.cancelling() if hasattr(worker, "cancelling") else not job.task.cancelled():
+                        raise
+                except Exception as e:
+                    self._finish(job, error=e)
+                else:
+                    self._finish(job, result=result)
+                finally:
+                    self._running -= 1
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, result: Any = None, error: Optional[BaseException] = None) -> None:
+        if job.future.done():
+            return
+        if self._latest.get(job.owner) is job:
+            del self._latest[job.owner]
+        if job.started_at is not None:
+            self._runs.append(time.perf_counter() - job.started_at)
+
+        if error is None:
+            self.counters["completed"] += 1
+            job.future.set_result(result)
+        else:
+            self.counters["cancelled" if isinstance(error, JobCancelledError) else "failed"] += 1
+            job.future.set_exception(error)
+            job.future.exception()  # nobody may be awaiting a superseded job
+        print(f"[Scheduler] {job.id} for {job.owner[:8]} {'done' if error is None else type(error).__name__} | {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        def avg(values) -> float:
+            return round(sum(values) / len(values), 3) if values else 0.0
+
+        return dict(
+            self.counters,
+            queue_depth=self._queue.qsize() if self._queue else 0,
+            running=self._running,
+            avg_wait_s=avg(self._waits),
+            max_wait_s=round(max(self._waits), 3) if self._waits else 0.0,
+            avg_run_s=avg(self._runs),
+        )
+
+    async def shutdown(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        self._loop = None
+
+
+scheduler = RequestScheduler()
+telemetry.register_stats("scheduler", scheduler.stats)
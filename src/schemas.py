@@ -0,0 +1,110 @@
+import json
+import re
+from typing import Any, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+# Structured state passed between agents. Every stage's output is validated against
+# one of these models and stored as compact JSON, so later instructions splice in
+# {"origin":"Delhi",...} rather than a paragraph of prose or a Python repr.
+
+
+class TripDetails(BaseModel):
+    origin: str
+    destination: str
+    days_of_stay: Optional[int] = None
+    budget: Optional[float] = None
+    departure_date: str = ""
+    return_date: str = ""
+    other_preferences: str = ""
+
+
+class FlightLeg(BaseModel):
+    airline: str
+    departure: str
+    arrival: str
+    dep_time: str = ""
+    arr_time: str = ""
+    duration_min: int = 0
+    stops: int = 0
+
+
+class FlightOffer(FlightLeg):
+    """One entry of the list `search_flights_async` returns: the outbound
+    leg's fields plus the total price and, for round trips, the return leg."""
+    price: float
+    currency: str = ""
+    return_leg: Optional[FlightLeg] = None
+
+
+class FlightOptions(BaseModel):
+    offers: List[FlightOffer]
+    note: str = ""
+
+
+class DayActivities(BaseModel):
+    day: int
+    morning: str
+    afternoon: str
+    evening: str
+    estimated_cost: Optional[float] = None
+
+
+class ActivityPlan(BaseModel):
+    days: List[DayActivities]
+
+
+class StageOutputError(ValueError):
+    """An agent's output did not match its schema; the run stops instead of passing it on."""
+
+
+def shape(model: Type[BaseModel]) -> str:
+    """Compact JSON-ish outline of a model for instructions, e.g. {"day":int,"morning":str}."""
+    def outline(annotation) -> str:
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return shape(annotation)
+        args = getattr(annotation, "__args__", ())
+        if getattr(annotation, "__origin__", None) in (list, List):
+            return f"[{outline(args[0])}]"
+        if args:  # Optional[X]
+            return outline(next(a for a in args if a is not type(None)))
+        return getattr(annotation, "__name__", str(annotation))
+
+    fields = (f'"{name}":{outline(f.annotation)}' for name, f in model.model_fields.items())
+    return "{" + ",".join(fields) + "}"
+
+
+def _json_value(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", value, re.S)
+    text = (fenced.group(1) if fenced else value).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        # JSON embedded in surrounding prose
+        match = re.search(r"[\[{].*[\]}]", text, re.S)
+        if match:
+            return json.loads(match.group(0))
+        raise
+
+
+def parse_stage_output(model: Type[BaseModel], value: Any) -> BaseModel:
+    """Validate an agent's output (dict, JSON text or fenced JSON) against `model`.
+
+    A bare list is accepted for models with a single list field, e.g. the offer list
+    for FlightOptions. Raises StageOutputError when the output cannot be parsed.
+    """
+    try:
+        data = _json_value(value)
+        list_fields = [n for n, f in model.model_fields.items() if getattr(f.annotation, "__origin__", None) in (list, List)]
+        if isinstance(data, list) and len(list_fields) == 1:
+            data = {list_fields[0]: data}
+        return model.model_validate(data)
+    except (ValueError, ValidationError) as e:
+        preview = str(value)[:200].replace("\n", " ")
+        raise StageOutputError(f"Output is not a valid {model.__name__}: {e.__class__.__name__} ({preview!r})") from e
+
+
+def compact(item: BaseModel) -> str:
+    return item.model_dump_json(exclude_none=True)
@@ -0,0 +1,315 @@
+"""Headless HTTP API for trip planning, on FastAPI/uvicorn. Flet is never imported.
+
+    python src/server.py [--host 127.0.0.1] [--port 8000] [--credentials credentials.json]
+
+    POST   /plans               {"query": ..., "render_mode": "template"} -> 202 {"id": ...}
+    GET    /plans/{id}          status, stage progress and timings
+    GET    /plans/{id}/events   the same as Server-Sent Events until the plan finishes
+    GET    /plans/{id}/html     the final HTML page
+    GET    /plans/{id}/plan     structured plan: trip_details, flights, activities, trip_plan
+    DELETE /plans/{id}          cancel a queued or running plan
+    GET    /health, /metrics    liveness and component stats
+    PUT    /telemetry           {"exporters": "console,json"} switches tracing at runtime
+
+Plans run through the shared scheduler, so concurrency and queue length are bounded
+by TRIPWISE_PLAN_WORKERS / TRIPWISE_PLAN_QUEUE_SIZE. A full queue answers 503.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+import api_keys
+import settings
+import telemetry
+from agents import get_runner
+from http_client import amadeus_stats, async_amadeus_client
+from pipeline import DRAFT_AUTHORS, Progress, run_pipeline
+from plan_cache import PLAN_KEYS
+from plan_store import plan_store
+from render import RENDER_MODES, parse_state_value, record_run, render_stats
+from scheduler import Job, JobCancelledError, QueueFullError, scheduler
+
+FINISHED = ("done", "failed", "cancelled")
+STRUCTURED_KEYS = ("trip_details", "flights", "activities", "trip_plan")
+
+
+class PlanRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=2000)
+    render_mode: str = settings.RENDER_MODE
+    # Plans from the same user_id supersede each other when TRIPWISE_CANCEL_SUPERSEDED is on.
+    user_id: Optional[str] = None
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+
+class TelemetryRequest(BaseModel):
+    exporters: str = ""
+
+
+@dataclass
+class PlanRecord:
+    id: str
+    query: str
+    render_mode: str
+    owner: str
+    timeout: float
+    status: str = "queued"  # queued, running, done, failed or cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stages: List[Dict[str, str]] = field(default_factory=list)
+    draft: str = ""
+    error: str = ""
+    html_id: Optional[int] = None
+    plan: Dict[str, Any] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    job: Optional[Job] = None
+    listeners: List["asyncio.Queue[Dict[str, Any]]"] = field(default_factory=list)
+
+    def public(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "query": self.query,
+            "render_mode": self.render_mode,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": self.stages,
+            "error": self.error,
+            "metrics": self.metrics,
+            "links": {"html": f"/plans/{self.id}/html", "plan": f"/plans/{self.id}/plan"} if self.status == "done" else {},
+        }
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        for queue in self.listeners:
+            queue.put_nowait({"event": event, "data": data})
+
+
+# Finished plans beyond TRIPWISE_API_MAX_PLANS are forgotten, oldest first.
+_plans: "OrderedDict[str, PlanRecord]" = OrderedDict()
+_credentials_error: Optional[str] = "not loaded"
+
+
+def _remember(record: PlanRecord) -> None:
+    _plans[record.id] = record
+    for plan_id in list(_plans):
+        if len(_plans) <= settings.API_MAX_PLANS:
+            break
+        if _plans[plan_id].status in FINISHED:
+            del _plans[plan_id]
+
+
+def _get(plan_id: str) -> PlanRecord:
+    record = _plans.get(plan_id)
+    if record is None:
+        raise HTTPException(404, f"No plan {plan_id}")
+    return record
+
+
+def load_credentials(path: str = "") -> None:
+    global _credentials_error
+    try:
+        api_keys.apply(api_keys.read_file(path) if path else api_keys.read_env())
+        _credentials_error = None
+    except (OSError, ValueError) as e:
+        _credentials_error = str(e)
+        print(f"[API] Credentials not loaded: {e}")
+
+
+#   ========================= Running plans =========================
+
+async def _run(record: PlanRecord):
+    record.status, record.started_at = "running", time.time()
+    record.publish("status", record.public())
+
+    async def on_progress(progress: Progress) -> None:
+        if progress.kind == "partial":
+            record.draft = progress.text
+            record.publish("partial", {"author": progress.author, "text": progress.text})
+            return
+        stage = {"kind": progress.kind, "author": progress.author, "label": progress.label}
+        record.stages.append(stage)
+        record.publish("stage", stage)
+
+    pipeline = run_pipeline(
+        get_runner(record.render_mode), record.query, user_id=record.owner, session_id=uuid.uuid4().hex,
+        on_progress=on_progress, discard_session=True, state_keys=PLAN_KEYS, partial_authors=DRAFT_AUTHORS,
+    )
+    return await asyncio.wait_for(pipeline, timeout=record.timeout)
+
+
+async def _watch(record: PlanRecord) -> None:
+    try:
+        result = await record.job.result()
+    except JobCancelledError:
+        record.status = "cancelled"
+    except asyncio.TimeoutError:
+        record.status, record.error = "failed", f"timed out after {record.timeout:.0f}s"
+    except Exception as e:
+        record.status, record.error = "failed", f"{type(e).__name__}: {e}"
+    else:
+        record_run(record.render_mode, result.elapsed, result.tokens_in, result.tokens_out)
+        record.html_id = plan_store.add(result.final_text or "<h3>Sorry, no plan generated. Try again!</h3>")
+        record.plan = {k: parse_state_value(result.state.get(k)) or result.state.get(k) for k in STRUCTURED_KEYS}
+        record.metrics = {
+            "elapsed_s": round(result.elapsed, 3),
+            "tokens_in": result.tokens_in,
+            "tokens_out": result.tokens_out,
+            "stage_seconds": result.stage_seconds,
+        }
+        record.status = "done"
+    record.finished_at = time.time()
+    record.draft = ""
+    record.publish("status", record.public())
+
+
+#   ========================= Endpoints =========================
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if _credentials_error == "not loaded":
+        load_credentials(settings.API_CREDENTIALS_FILE)
+    yield
+    await scheduler.shutdown()
+    await async_amadeus_client.aclose()
+    telemetry.flush()
+
+
+api = FastAPI(title="TripWise API", lifespan=lifespan)
+
+
+@api.post("/plans", status_code=202)
+async def submit_plan(request: PlanRequest) -> Dict[str, Any]:
+    if _credentials_error:
+        raise HTTPException(503, f"Credentials not configured: {_credentials_error}")
+    if request.render_mode not in RENDER_MODES:
+        raise HTTPException(422, f"render_mode must be one of {RENDER_MODES}")
+
+    plan_id = uuid.uuid4().hex
+    record = PlanRecord(
+        id=plan_id,
+        query=request.query.strip(),
+        render_mode=request.render_mode,
+        owner=request.user_id or plan_id,
+        timeout=min(request.timeout or settings.API_PLAN_TIMEOUT, settings.API_PLAN_TIMEOUT),
+    )
+    try:
+        record.job = scheduler.submit(record.owner, lambda: _run(record))
+    except QueueFullError as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "5"})
+    _remember(record)
+    asyncio.create_task(_watch(record))
+    return {"id": plan_id, "status": record.status, "links": {"self": f"/plans/{plan_id}", "events": f"/plans/{plan_id}/events"}}
+
+
+@api.get("/plans/{plan_id}")
+async def plan_status(plan_id: str) -> Dict[str, Any]:
+    record = _get(plan_id)
+    return dict(record.public(), draft=record.draft)
+
+
+@api.get("/plans/{plan_id}/events")
+async def plan_events(plan_id: str) -> StreamingResponse:
+    record = _get(plan_id)
+
+    async def stream():
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        record.listeners.append(queue)
+        try:
+            yield f"event: status\ndata: {json.dumps(record.public())}\n\n"
+            while record.status not in FINISHED:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+            while not queue.empty():
+                message = queue.get_nowait()
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            record.listeners.remove(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _finished(plan_id: str) -> PlanRecord:
+    record = _get(plan_id)
+    if record.status != "done":
+        raise HTTPException(409, f"Plan {plan_id} is {record.status}")
+    return record
+
+
+@api.get("/plans/{plan_id}/html", response_class=HTMLResponse)
+async def plan_html(plan_id: str) -> HTMLResponse:
+    html = plan_store.get(_finished(plan_id).html_id)
+    if html is None:
+        raise HTTPException(410, f"Plan {plan_id} has expired")
+    return HTMLResponse(html)
+
+
+@api.get("/plans/{plan_id}/plan")
+async def plan_structured(plan_id: str) -> Dict[str, Any]:
+    return _finished(plan_id).plan
+
+
+@api.delete("/plans/{plan_id}")
+async def cancel_plan(plan_id: str) -> Dict[str, Any]:
+    record = _get(plan_id)
+    cancelled = record.job is not None and scheduler.cancel(record.owner, record.job)
+    return {"id": plan_id, "cancelled": cancelled}
+
+
+@api.get("/health")
+async def health() -> Dict[str, Any]:
+    return {
+        "status": "ok" if _credentials_error is None else "degraded",
+        "credentials": _credentials_error or "loaded",
+        "scheduler": scheduler.stats(),
+        "plans": len(_plans),
+    }
+
+
+@api.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    return {
+        "components": telemetry.snapshot(),
+        "amadeus_http": amadeus_stats.snapshot(),
+        "render": render_stats(),
+        "telemetry": telemetry.exporters(),
+    }
+
+
+@api.put("/telemetry")
+async def set_telemetry(request: TelemetryRequest) -> Dict[str, Any]:
+    try:
+        telemetry.configure(request.exporters)
+    except (ImportError, ValueError, OSError) as e:
+        raise HTTPException(422, str(e))
+    return {"exporters": telemetry.exporters()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TripWise headless API server")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--credentials", default=settings.API_CREDENTIALS_FILE, help="credentials.json (default: environment)")
+    args = parser.parse_args()
+
+    load_credentials(args.credentials)
+    uvicorn.run(api, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+
+#   ========================= Runtime Settings =========================
+# Every value can be overridden through the environment, which is also how the
+# local stub servers are wired in (e.g. AMADEUS_BASE_URL=http://127.0.0.1:8080).
+
+AMADEUS_BASE_URL = os.environ.get("AMADEUS_BASE_URL", "https://test.api.amadeus.com").rstrip("/")
+
+# Refresh the OAuth token this many seconds before Amadeus says it expires.
+TOKEN_REFRESH_MARGIN = float(os.environ.get("TRIPWISE_TOKEN_REFRESH_MARGIN", "60"))
+
+# Local caches (IATA codes, ...) persist here between runs.
+CACHE_DIR = os.environ.get("TRIPWISE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".tripwise", "cache"))
+
+# City -> IATA resolution. Set TRIPWISE_IATA_DB to an empty string to keep it in memory only.
+IATA_CACHE_SIZE = int(os.environ.get("TRIPWISE_IATA_CACHE_SIZE", "2048"))
+IATA_TTL = float(os.environ.get("TRIPWISE_IATA_TTL", str(30 * 24 * 3600)))
+IATA_NEGATIVE_TTL = float(os.environ.get("TRIPWISE_IATA_NEGATIVE_TTL", "600"))
+IATA_CACHE_DB = os.environ.get("TRIPWISE_IATA_DB", os.path.join(CACHE_DIR, "iata.sqlite3"))
+IATA_USE_SEED = os.environ.get("TRIPWISE_IATA_SEED", "1") != "0"
+
+# Shared HTTP client for Amadeus calls.
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("TRIPWISE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("TRIPWISE_HTTP_READ_TIMEOUT", "15"))
+HTTP_MAX_RETRIES = int(os.environ.get("TRIPWISE_HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.environ.get("TRIPWISE_HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.environ.get("TRIPWISE_HTTP_BACKOFF_MAX", "10"))
+HTTP_POOL_SIZE = int(os.environ.get("TRIPWISE_HTTP_POOL_SIZE", "20"))
+
+# Async flight search fan-out (flexible dates, batches of routes).
+FLIGHT_SEARCH_CONCURRENCY = int(os.environ.get("TRIPWISE_FLIGHT_SEARCH_CONCURRENCY", "4"))
+FLIGHT_MAX_FLEX_DAYS = int(os.environ.get("TRIPWISE_FLIGHT_MAX_FLEX_DAYS", "3"))
+# Offers requested from Amadeus per query; they are ranked locally and cut to max_results.
+FLIGHT_CANDIDATES = int(os.environ.get("TRIPWISE_FLIGHT_CANDIDATES", "20"))
+
+# Flight-offer response cache. TRIPWISE_FLIGHT_CACHE_DB enables on-disk persistence.
+FLIGHT_CACHE_TTL = float(os.environ.get("TRIPWISE_FLIGHT_CACHE_TTL", "300"))
+FLIGHT_CACHE_SIZE = int(os.environ.get("TRIPWISE_FLIGHT_CACHE_SIZE", "256"))
+FLIGHT_CACHE_DB = os.environ.get("TRIPWISE_FLIGHT_CACHE_DB", "")
+
+# How the final HTML is produced: "chain" (three LLM stages), "single" (one LLM stage)
+# or "template" (local template, no LLM call). Can also be picked per request in the UI.
+RENDER_MODE = os.environ.get("TRIPWISE_RENDER_MODE", "chain")
+
+# Stream partial model output (SSE) and per-agent progress into the chat while a plan runs.
+STREAM_EVENTS = os.environ.get("TRIPWISE_STREAM", "1") != "0"
+
+# Plan scheduling: concurrent pipeline runs, queued requests beyond that, and whether a
+# new query from the same user/page cancels their previous one.
+PLAN_WORKERS = int(os.environ.get("TRIPWISE_PLAN_WORKERS", "2"))
+PLAN_QUEUE_SIZE = int(os.environ.get("TRIPWISE_PLAN_QUEUE_SIZE", "16"))
+CANCEL_SUPERSEDED = os.environ.get("TRIPWISE_CANCEL_SUPERSEDED", "1") != "0"
+
+# Plan cache keyed on the CoordinatorAgent's trip_details. A budget within the relative
+# tolerance and a departure date within the day tolerance count as the same trip.
+PLAN_CACHE_ENABLED = os.environ.get("TRIPWISE_PLAN_CACHE", "1") != "0"
+PLAN_CACHE_SIZE = int(os.environ.get("TRIPWISE_PLAN_CACHE_SIZE", "200"))
+PLAN_CACHE_TTL = float(os.environ.get("TRIPWISE_PLAN_CACHE_TTL", str(6 * 3600)))
+PLAN_CACHE_BUDGET_TOLERANCE = float(os.environ.get("TRIPWISE_PLAN_CACHE_BUDGET_TOLERANCE", "0.1"))
+PLAN_CACHE_DATE_TOLERANCE_DAYS = int(os.environ.get("TRIPWISE_PLAN_CACHE_DATE_TOLERANCE_DAYS", "0"))
+PLAN_CACHE_DB = os.environ.get("TRIPWISE_PLAN_CACHE_DB", os.path.join(CACHE_DIR, "plans.sqlite3"))
+
+# Local trip-details parser in front of the CoordinatorAgent. Queries it parses with at
+# least this confidence (0..1) skip the LLM call; anything else falls back to the LLM.
+LOCAL_PARSER_ENABLED = os.environ.get("TRIPWISE_LOCAL_PARSER", "1") != "0"
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.environ.get("TRIPWISE_LOCAL_PARSER_MIN_CONFIDENCE", "0.8"))
+
+# Speculative prefetch while the user types (off by default). After a pause of
+# PREFETCH_DEBOUNCE seconds the half-typed query is parsed locally and the Amadeus token,
+# IATA and flight-offer caches are warmed for the route it names. At most PREFETCH_RATE
+# prefetches per minute, in bursts of up to PREFETCH_BURST, across all windows.
+PREFETCH_ENABLED = os.environ.get("TRIPWISE_PREFETCH", "0") != "0"
+PREFETCH_DEBOUNCE = float(os.environ.get("TRIPWISE_PREFETCH_DEBOUNCE", "0.6"))
+PREFETCH_RATE = float(os.environ.get("TRIPWISE_PREFETCH_RATE", "6"))
+PREFETCH_BURST = int(os.environ.get("TRIPWISE_PREFETCH_BURST", "3"))
+
+# Generated HTML plans: how many stay in memory before older ones are gzipped to disk,
+# where those files (and the pages opened in the browser) go, and when they are deleted.
+PLAN_STORE_MEMORY = int(os.environ.get("TRIPWISE_PLAN_STORE_MEMORY", "20"))
+PLAN_STORE_DIR = os.environ.get("TRIPWISE_PLAN_STORE_DIR", os.path.join(tempfile.gettempdir(), "tripwise-plans"))
+PLAN_STORE_MAX_AGE = float(os.environ.get("TRIPWISE_PLAN_STORE_MAX_AGE", str(24 * 3600)))
+
+# Print import times and time to first frame at startup (and when a heavy module is
+# first loaded). With PREWARM the agent modules are imported in the background once
+# credentials are loaded, instead of on the first query.
+STARTUP_REPORT = os.environ.get("TRIPWISE_STARTUP_REPORT", "1") != "0"
+PREWARM_AGENTS = os.environ.get("TRIPWISE_PREWARM", "1") != "0"
+
+# Tracing/metrics exporters: comma-separated "console", "otlp" and/or "json", empty for
+# off. Can be switched at runtime with telemetry.configure(). OTLP uses the standard
+# OTEL_EXPORTER_OTLP_* variables; "json" appends one JSON document per line to the file.
+TELEMETRY_EXPORTERS = os.environ.get("TRIPWISE_TELEMETRY", "")
+TELEMETRY_JSON_PATH = os.environ.get("TRIPWISE_TELEMETRY_FILE", os.path.join(CACHE_DIR, "telemetry.jsonl"))
+TELEMETRY_METRIC_INTERVAL = float(os.environ.get("TRIPWISE_TELEMETRY_METRIC_INTERVAL", "30"))
+
+# Headless API server (server.py). Credentials come from the JSON file, if given, else
+# from GEMINI_API_KEY/GOOGLE_API_KEY, AMADEUS_CLIENT_ID and AMADEUS_CLIENT_SECRET.
+API_HOST = os.environ.get("TRIPWISE_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("TRIPWISE_API_PORT", "8000"))
+API_CREDENTIALS_FILE = os.environ.get("TRIPWISE_CREDENTIALS", "")
+API_PLAN_TIMEOUT = float(os.environ.get("TRIPWISE_API_PLAN_TIMEOUT", "300"))
+API_MAX_PLANS = int(os.environ.get("TRIPWISE_API_MAX_PLANS", "500"))
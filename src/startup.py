@@ -0,0 +1,55 @@
+import importlib
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Imported first by the entry points, so this is (close to) when our own code started.
+T0 = time.perf_counter()
+
+_imports: Dict[str, float] = {}
+_marks: List[Tuple[str, float]] = []
+
+
+@contextmanager
+def timed_import(name: str):
+    """Record how long the import(s) inside the block took under `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _imports.setdefault(name, time.perf_counter() - start)
+
+
+def import_module(name: str):
+    """Import a heavy module on demand, recording the first import time."""
+    with timed_import(name):
+        return importlib.import_module(name)
+
+
+def mark(label: str) -> None:
+    """Note a startup milestone, e.g. "first frame", relative to T0."""
+    if all(label != existing for existing, _ in _marks):
+        _marks.append((label, time.perf_counter() - T0))
+
+
+def report() -> Dict[str, object]:
+    result: Dict[str, object] = {
+        "imports_s": {name: round(s, 3) for name, s in _imports.items()},
+        "marks_s": {label: round(s, 3) for label, s in _marks},
+    }
+    try:
+        import psutil
+
+        # Includes interpreter start-up (and unpacking, for the packaged executable).
+        result["process_age_s"] = round(time.time() - psutil.Process().create_time(), 3)
+    except Exception:
+        pass
+    return result
+
+
+def print_report() -> None:
+    r = report()
+    imports = ", ".join(f"{n} {s:.2f}s" for n, s in r["imports_s"].items())
+    marks = ", ".join(f"{n} at {s:.2f}s" for n, s in r["marks_s"].items())
+    age = f" | process age {r['process_age_s']:.2f}s" if "process_age_s" in r else ""
+    print(f"[Startup] imports: {imports or '-'} | {marks or '-'}{age}")
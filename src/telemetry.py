@@ -0,0 +1,314 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import settings
+
+# Tracing and metrics for plans, agents, tools, LLM tokens, Amadeus HTTP calls and caches.
+#
+# Off by default. configure("console"), configure("otlp,json") or TRIPWISE_TELEMETRY
+# switch it on; configure("") switches it off again. While off every hook below
+# returns after one attribute check and the OpenTelemetry SDK is not even imported.
+EXPORTERS = ("console", "otlp", "json")
+
+
+class _State:
+    def __init__(self, exporters: Tuple[str, ...], tracer_provider, meter_provider, files):
+        self.exporters = exporters
+        self.tracer_provider = tracer_provider
+        self.meter_provider = meter_provider
+        self.tracer = tracer_provider.get_tracer("tripwise")
+        self.files = files
+        meter = meter_provider.get_meter("tripwise")
+        self.agent_duration = meter.create_histogram("tripwise.agent.duration", unit="s")
+        self.tool_duration = meter.create_histogram("tripwise.tool.duration", unit="s")
+        self.http_duration = meter.create_histogram("tripwise.http.duration", unit="s")
+        self.llm_tokens = meter.create_counter("tripwise.llm.tokens", unit="{token}")
+        self.plans = meter.create_counter("tripwise.plans", unit="{plan}")
+        meter.create_observable_gauge("tripwise.stats", callbacks=[_observe_stats])
+        # (invocation, agent or call id) -> (span, start time, plan span it belongs to)
+        self.spans: Dict[Tuple[str, str], Tuple[Any, float, Any]] = {}
+        self.lock = threading.Lock()
+
+
+_state: Optional[_State] = None
+_configure_lock = threading.Lock()
+_stats_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_plan_span: contextvars.ContextVar = contextvars.ContextVar("tripwise_plan_span", default=None)
+_tool_span: contextvars.ContextVar = contextvars.ContextVar("tripwise_tool_span", default=None)
+
+
+def enabled() -> bool:
+    return _state is not None
+
+
+def exporters() -> Tuple[str, ...]:
+    state = _state
+    return state.exporters if state is not None else ()
+
+
+def register_stats(component: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Publish a component's stats() dict (cache hits/misses, ...) as the tripwise.stats gauge."""
+    _stats_sources[component] = stats
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Every registered component's current stats, whether or not telemetry is on."""
+    result = {}
+    for component, stats in list(_stats_sources.items()):
+        try:
+            result[component] = stats()
+        except Exception as e:
+            result[component] = {"error": str(e)}
+    return result
+
+
+def _observe_stats(options):
+    from opentelemetry.metrics import Observation
+
+    for component, stats in list(_stats_sources.items()):
+        try:
+            values = stats()
+        except Exception:
+            continue
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield Observation(value, {"component": component, "stat": key})
+
+
+def _exporters(names: Tuple[str, ...]):
+    from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    spans, metrics, files = [], [], []
+    for name in names:
+        if name == "console":
+            spans.append(ConsoleSpanExporter())
+            metrics.append(ConsoleMetricExporter())
+        elif name == "json":
+            # One JSON document per line; the console exporters with a compact formatter.
+            os.makedirs(os.path.dirname(settings.TELEMETRY_JSON_PATH) or ".", exist_ok=True)
+            f = open(settings.TELEMETRY_JSON_PATH, "a", encoding="utf-8")
+            files.append(f)
+            spans.append(ConsoleSpanExporter(out=f, formatter=lambda span: span.to_json(indent=None) + "\n"))
+            metrics.append(ConsoleMetricExporter(out=f, formatter=lambda data: data.to_json(indent=None) + "\n"))
+        elif name == "otlp":
+            # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables.
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            spans.append(OTLPSpanExporter())
+            metrics.append(OTLPMetricExporter())
+        else:
+            raise ValueError(f"Unknown telemetry exporter '{name}', expected some of {EXPORTERS}")
+    return spans, metrics, files
+
+
+def configure(exporters: str) -> None:
+    """Switch telemetry to the comma-separated exporters, or off with an empty string."""
+    global _state
+    names = tuple(n.strip().lower() for n in (exporters or "").split(",") if n.strip())
+    with _configure_lock:
+        old, _state = _state, None
+        if old is not None:
+            old.tracer_provider.shutdown()
+            old.meter_provider.shutdown()
+            for f in old.files:
+                f.close()
+        if not names:
+            print("[Telemetry] off")
+            return
+
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        span_exporters, metric_exporters, files = _exporters(names)
+        resource = Resource.create({"service.name": "tripwise"})
+        tracer_provider = TracerProvider(resource=resource)
+        for exporter in span_exporters:
+            tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
+        meter_provider = MeterProvider(
+            resource=resource,
+            metric_readers=[
+                PeriodicExportingMetricReader(e, export_interval_millis=settings.TELEMETRY_METRIC_INTERVAL * 1000)
+                for e in metric_exporters
+            ],
+        )
+        _state = _State(names, tracer_provider, meter_provider, files)
+        print(f"[Telemetry] exporting to {', '.join(names)}")
+
+
+def flush() -> None:
+    state = _state
+    if state is not None:
+        state.tracer_provider.force_flush()
+        state.meter_provider.force_flush()
+
+
+#   ========================= Spans =========================
+
+def _context(parent):
+    from opentelemetry import trace
+
+    return trace.set_span_in_context(parent) if parent is not None else None
+
+
+@contextmanager
+def plan_span(app_name: str = ""):
+    """Root span for one pipeline run; agent spans started inside it become its children."""
+    state = _state
+    if state is None:
+        yield None
+        return
+    span = state.tracer.start_span("tripwise.plan", attributes={"tripwise.app": app_name})
+    token = _plan_span.set(span)
+    failed = False
+    try:
+        yield span
+    except BaseException as e:
+        failed = True
+        span.record_exception(e)
+        span.set_attribute("error", True)
+        raise
+    finally:
+        _plan_span.reset(token)
+        # ADK skips after_agent/after_tool when an agent or tool raises, so whatever is
+        # still open for this plan is ended here instead of leaking.
+        for child in _sweep(state, span):
+            if failed:
+                child.set_attribute("error", True)
+            child.end()
+        span.end()
+        state.plans.add(1)
+
+
+def _start(state: _State, key: Tuple[str, str], name: str, parent, attributes: Dict[str, Any]):
+    span = state.tracer.start_span(name, context=_context(parent), attributes=attributes)
+    with state.lock:
+        state.spans[key] = (span, time.perf_counter(), _plan_span.get())
+    return span
+
+
+def _end(state: _State, key: Tuple[str, str]):
+    with state.lock:
+        entry = state.spans.pop(key, None)
+    if entry is None:
+        return None, 0.0
+    span, started, _ = entry
+    span.end()
+    return span, time.perf_counter() - started
+
+
+def _sweep(state: _State, plan) -> list:
+    """Remove and return the spans still open under `plan`, innermost (latest) first."""
+    with state.lock:
+        keys = [key for key, entry in state.spans.items() if entry[2] is plan]
+        entries = [state.spans.pop(key) for key in keys]
+    return [entry[0] for entry in sorted(entries, key=lambda entry: entry[1], reverse=True)]
+
+
+def _agent_span(state: _State, invocation_id: str, agent_name: str):
+    with state.lock:
+        entry = state.spans.get((invocation_id, agent_name))
+    return entry[0] if entry else None
+
+
+#   ========================= ADK callbacks =========================
+# Attached to every agent by agents.build_root_agent. They always return None so the
+# agent, model and tool results are left untouched.
+
+def before_agent(callback_context) -> None:
+    state = _state
+    if state is None:
+        return None
+    agent = callback_context._invocation_context.agent
+    parent = agent.parent_agent
+    parent_span = _agent_span(state, callback_context.invocation_id, parent.name) if parent else None
+    _start(
+        state, (callback_context.invocation_id, agent.name), f"agent {agent.name}",
+        parent_span or _plan_span.get(), {"tripwise.agent": agent.name},
+    )
+    return None
+
+
+def after_agent(callback_context) -> None:
+    state = _state
+    if state is None:
+        return None
+    _, seconds = _end(state, (callback_context.invocation_id, callback_context.agent_name))
+    state.agent_duration.record(seconds, {"agent": callback_context.agent_name})
+    return None
+
+
+def after_model(callback_context, llm_response) -> None:
+    state = _state
+    usage = llm_response.usage_metadata if state is not None else None
+    if usage is None or llm_response.partial:
+        return None
+    agent = callback_context.agent_name
+    tokens_in, tokens_out = usage.prompt_token_count or 0, usage.candidates_token_count or 0
+    state.llm_tokens.add(tokens_in, {"agent": agent, "direction": "input"})
+    state.llm_tokens.add(tokens_out, {"agent": agent, "direction": "output"})
+    span = _agent_span(state, callback_context.invocation_id, agent)
+    if span is not None:
+        span.add_event("llm.response", {"llm.tokens.input": tokens_in, "llm.tokens.output": tokens_out})
+    return None
+
+
+def before_tool(tool, args, tool_context) -> None:
+    state = _state
+    if state is None:
+        return None
+    key = (tool_context.invocation_id, tool_context.function_call_id or tool.name)
+    parent = _agent_span(state, tool_context.invocation_id, tool_context.agent_name)
+    span = _start(state, key, f"tool {tool.name}", parent, {"tripwise.tool": tool.name, "tripwise.agent": tool_context.agent_name})
+    _tool_span.set(span)  # HTTP calls made by the tool nest under it
+    return None
+
+
+def after_tool(tool, args, tool_context, tool_response) -> None:
+    state = _state
+    if state is None:
+        return None
+    span, seconds = _end(state, (tool_context.invocation_id, tool_context.function_call_id or tool.name))
+    _tool_span.set(None)
+    if span is not None and isinstance(tool_response, dict) and tool_response.get("error"):
+        span.set_attribute("error", True)
+    state.tool_duration.record(seconds, {"tool": tool.name})
+    return None
+
+
+AGENT_CALLBACKS = {"before_agent_callback": before_agent, "after_agent_callback": after_agent}
+LLM_CALLBACKS = {"after_model_callback": after_model, "before_tool_callback": before_tool, "after_tool_callback": after_tool}
+
+
+#   ========================= HTTP =========================
+
+def http_call(endpoint: str, seconds: float, status: Optional[int], retries: int) -> None:
+    """One finished Amadeus request (after retries), called by http_client.EndpointStats."""
+    state = _state
+    if state is None:
+        return
+    attributes = {"http.route": endpoint, "http.status_code": status or 0, "http.retries": retries}
+    state.http_duration.record(seconds, {"endpoint": endpoint, "status": status or 0})
+    end = time.time_ns()
+    parent = _tool_span.get() or _plan_span.get()
+    span = state.tracer.start_span(
+        f"HTTP {endpoint}", context=_context(parent), attributes=attributes, start_time=end - int(seconds * 1e9)
+    )
+    if status is None or status >= 400:
+        span.set_attribute("error", True)
+    span.end(end_time=end)
+
+
+if settings.TELEMETRY_EXPORTERS:
+    try:
+        configure(settings.TELEMETRY_EXPORTERS)
+    except (ImportError, ValueError, OSError) as e:
+        print(f"[Telemetry] could not start ({e}), continuing without it")
@@ -0,0 +1,227 @@
+import re
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import settings
+import telemetry
+from iata_seed import SEED_IATA
+
+# Fields the CoordinatorAgent returns, and how much each one counts towards confidence.
+WEIGHTS = {"destination": 0.3, "origin": 0.2, "departure_date": 0.2, "days_of_stay": 0.2, "budget": 0.1}
+# FlightAgent cannot search without a departure date, so a parse without one ("next
+# month", an impossible "31 Feb") stays below any sensible threshold and goes to the LLM.
+NO_DATE_CONFIDENCE = 0.5
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+)}
+
+# One to three words, none of them "to", so "I want to fly to Goa" never yields a city.
+_CITY = r"((?:(?!to\b)[A-Za-z][A-Za-z.'-]*)(?:\s+(?!to\b)[A-Za-z][A-Za-z.'-]*){0,2}?)"
+_NOT_CITY = {"i", "we", "me", "my", "a", "an", "the", "want", "plan", "trip", "go", "fly", "travel", "need", "please"}
+_ROUTE_PATTERNS = [
+    re.compile(rf"\bfrom\s+{_CITY}\s+to\s+{_CITY}(?=\s+(?:for|on|from|in|with|under|within|budget|starting|leaving|\d)|[,.;!?]|$)", re.I),
+    re.compile(rf"\b(?:trip|travel|go|going|fly|flying|vacation|holiday)\s+to\s+{_CITY}\s+from\s+{_CITY}(?=\s+(?:for|on|in|with|under|within|budget|starting|leaving|\d)|[,.;!?]|$)", re.I),
+    re.compile(rf"^\s*{_CITY}\s+(?:to|->|→)\s+{_CITY}(?=\s+(?:for|on|from|in|with|under|within|budget|starting|leaving|\d)|[,.;!?]|$)", re.I),
+]
+_DAYS = re.compile(r"\b(\d{1,2})\s*(?:-\s*)?(days?|nights?)\b", re.I)
+_WEEKS = re.compile(r"\b(?:(\d)|a|one)\s+weeks?\b", re.I)
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DMY_DATE = re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4})\b")
+# Whole month names and their usual abbreviations only, so "Marseille 6" or "2 junior" are no dates.
+_MONTH_NAME = (
+    r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+)
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+{_MONTH_NAME}\.?,?(?:\s+(\d{{4}}))?\b", re.I)
+_MONTH_DAY = re.compile(rf"\b{_MONTH_NAME}\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?(?:\s+(\d{{4}}))?\b", re.I)
+_BUDGET = re.compile(
+    r"(?:budget|under|within|upto|up to|max(?:imum)?|₹|rs\.?|inr)\s*(?:of|is|:)?\s*(?:₹|rs\.?|inr)?\s*"
+    r"(\d[\d,]*(?:\.\d+)?)\s*(k|lakh|lakhs|lac|l)?\b"
+    # "max 1 stop", "under 3 hours": the trigger words also bound things other than money
+    r"(?!\s*(?:days?|nights?|weeks?|hours?|hrs?|h|minutes?|mins?|stops?|layovers?|stars?|km|kms|kg|adults?|people|persons?)\b)",
+    re.I,
+)
+_ADULTS = re.compile(r"\b(\d{1,2})\s+(?:adults?|people|persons?|travell?ers|pax)\b", re.I)
+_PREFS = re.compile(r"\b(?:prefer(?:ence)?s?|interested in|love|focus on)\b[:\s]+(.+?)(?:[.;!?]|$)", re.I)
+# Glue words left between the parsed parts; any other leftover word is a preference.
+_FILLER = {
+    "i", "we", "me", "my", "us", "our", "a", "an", "the", "want", "wants", "need", "would", "like", "please", "can", "you",
+    "plan", "planning", "trip", "travel", "go", "going", "fly", "flying", "vacation", "holiday", "visit", "book",
+    "to", "from", "for", "on", "in", "at", "of", "is", "and", "around", "about", "starting", "leaving", "return",
+    "days", "day", "nights", "weeks", "budget", "total", "rs", "inr", "₹", "within", "under", "upto", "up", "max",
+}
+# More unparsed words than this and the query probably says something the regexes miss.
+MAX_LEFTOVER_WORDS = 6
+
+
+def _month(name: str) -> int:
+    return MONTHS[name[:3].lower()]
+
+
+def _future(year: Optional[str], month: int, day: int, today: date) -> Optional[date]:
+    try:
+        found = date(int(year), month, day) if year else date(today.year, month, day)
+    except ValueError:
+        return None
+    if not year and found < today:
+        found = found.replace(year=today.year + 1)
+    return found
+
+
+def _find_date(text: str, today: date) -> Tuple[Optional[date], Optional[re.Match]]:
+    """The departure date and the match it came from; None with a match for dates like "31 Feb"."""
+    for m in _ISO_DATE.finditer(text):
+        found = _future(m.group(1), int(m.group(2)), int(m.group(3)), today)
+        if found:
+            return found, m
+    for m in _DMY_DATE.finditer(text):
+        found = _future(m.group(3), int(m.group(2)), int(m.group(1)), today)
+        if found:
+            return found, m
+    m = _DAY_MONTH.search(text)
+    if m:
+        return _future(m.group(3), _month(m.group(2)), int(m.group(1)), today), m
+    m = _MONTH_DAY.search(text)
+    if m:
+        return _future(m.group(3), _month(m.group(1)), int(m.group(2)), today), m
+    return None, None
+
+
+def _leftover(text: str, matches: List[re.Match]) -> List[str]:
+    """Phrases of `text` outside the parsed matches that are more than glue words."""
+    chars = list(text)
+    for m in matches:
+        chars[m.start():m.end()] = "|" * (m.end() - m.start())
+    phrases = []
+    for chunk in re.split(r"[|,.;:!?()\n]+", "".join(chars)):
+        words = chunk.split()
+        while words and words[0].casefold() in _FILLER:
+            words.pop(0)
+        while words and words[-1].casefold() in _FILLER | {"with"}:
+            words.pop()
+        if words and not (len(words) == 1 and words[0].casefold() == "with"):
+            phrases.append(" ".join(words))
+    return phrases
+
+
+def _clean_city(name: str) -> str:
+    name = re.sub(r"\s+", " ", name).strip(" .,'-")
+    return name.title() if name.islower() else name
+
+
+def parse_trip_query(text: str, today: Optional[date] = None) -> Tuple[Dict, float]:
+    """Extract CoordinatorAgent-style trip_details from a plain query, with a 0..1 confidence."""
+    today = today or date.today()
+    text = (text or "").strip()
+    details: Dict = {
+        "origin": "",
+        "destination": "",
+        "days_of_stay": None,
+        "budget": None,
+        "departure_date": "",
+        "return_date": "",
+        "other_preferences": "",
+    }
+
+    matches = []
+    for pattern in _ROUTE_PATTERNS:
+        m = pattern.search(text)
+        if not m:
+            continue
+        a, b = _clean_city(m.group(1)), _clean_city(m.group(2))
+        if a.casefold() == b.casefold() or _NOT_CITY & set(f"{a} {b}".casefold().split()):
+            continue
+        # "trip to X from Y" names the destination first
+        details["origin"], details["destination"] = (b, a) if pattern is _ROUTE_PATTERNS[1] else (a, b)
+        matches.append(m)
+        break
+
+    m = _DAYS.search(text)
+    if m:
+        days = int(m.group(1))
+        details["days_of_stay"] = days if m.group(2).lower().startswith("day") else days + 1
+    else:
+        m = _WEEKS.search(text)
+        if m:
+            details["days_of_stay"] = 7 * int(m.group(1) or 1)
+    matches.append(m)
+
+    start, m = _find_date(text, today)
+    if start:
+        matches.append(m)
+        details["departure_date"] = start.isoformat()
+        if details["days_of_stay"]:
+            details["return_date"] = (start + timedelta(days=details["days_of_stay"] - 1)).isoformat()
+
+    m = _BUDGET.search(text)
+    if m:
+        amount = float(m.group(1).replace(",", ""))
+        unit = (m.group(2) or "").lower()
+        amount *= 1000 if unit == "k" else 100000 if unit.startswith("l") else 1
+        details["budget"] = amount
+    matches.append(m)
+
+    prefs = []
+    m = _ADULTS.search(text)
+    if m:
+        prefs.append(f"{m.group(1)} adults")
+    matches.append(m)
+    m = _PREFS.search(text)
+    if m:
+        prefs.append(m.group(1).strip())
+    matches.append(m)
+    # Whatever the patterns above did not read ("vegetarian food", "in business class")
+    # still reaches the agents, and keeps otherwise equal queries apart in the plan cache.
+    leftover = _leftover(text, [m for m in matches if m])
+    details["other_preferences"] = ", ".join(prefs + leftover)
+
+    confidence = sum(w for field, w in WEIGHTS.items() if details[field])
+    if not details["departure_date"]:
+        confidence = min(confidence, NO_DATE_CONFIDENCE)
+    if sum(len(p.split()) for p in leftover) > MAX_LEFTOVER_WORDS:
+        confidence -= 0.2
+    # Unknown place names are where a regex is most likely to be wrong.
+    for field in ("origin", "destination"):
+        if details[field] and details[field].casefold() not in SEED_IATA:
+            confidence -= 0.1
+    return details, round(max(confidence, 0.0), 2)
+
+
+class ParserStats:
+    """How often the local parser answered instead of the CoordinatorAgent LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local = 0
+        self.fallback = 0
+
+    def record(self, used_local: bool) -> None:
+        with self._lock:
+            if used_local:
+                self.local += 1
+            else:
+                self.fallback += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.local + self.fallback
+            return {
+                "local": self.local,
+                "fallback": self.fallback,
+                "llm_avoided_rate": round(self.local / total, 3) if total else 0.0,
+            }
+
+
+parser_stats = ParserStats()
+telemetry.register_stats("trip_parser", parser_stats.snapshot)
+
+
+def confident_trip_details(text: str, min_confidence: float = settings.LOCAL_PARSER_MIN_CONFIDENCE) -> Optional[Dict]:
+    """trip_details when the local parse is confident enough to skip the LLM, else None."""
+    details, confidence = parse_trip_query(text)
+    used_local = confidence >= min_confidence
+    parser_stats.record(used_local)
+    print(f"[Trip Parser] confidence {confidence:.2f} -> {'local' if used_local else 'LLM'} | {parser_stats.snapshot()}")
+    return details if used_local else None
@@ -0,0 +1,24 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+
+# Before settings is imported: keep the caches in memory and the backoff short.
+os.environ.update({
+    "TRIPWISE_IATA_DB": "",
+    "TRIPWISE_FLIGHT_CACHE_DB": "",
+    "TRIPWISE_HTTP_BACKOFF_BASE": "0.01",
+})
+
+import pytest  # noqa: E402
+
+from fake_amadeus import FakeAmadeus  # noqa: E402
+
+
+@pytest.fixture
+def fake():
+    server = FakeAmadeus(latency=0.0, jitter=0.0)
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+
+import flights
+from amadeus_auth import TokenManager
+from http_client import AsyncAmadeusClient
+
+LOCATIONS = flights.LOCATIONS_PATH
+PARAMS = {"keyword": "Goa", "subType": "CITY", "view": "LIGHT"}
+
+
+def _token_manager(fake) -> TokenManager:
+    manager = TokenManager(AsyncAmadeusClient(base_url=fake.url), refresh_margin=0)
+    manager.configure("client-id", "client-secret")
+    return manager
+
+
+def test_retries_503_until_success(fake):
+    fake.fail_next(LOCATIONS, 503, times=2)
+    client = AsyncAmadeusClient(base_url=fake.url, max_retries=3)
+
+    r = asyncio.run(client.get(LOCATIONS, token="t", params=PARAMS))
+
+    assert r.status_code == 200
+    assert fake.calls[LOCATIONS] == 3
+    assert client.stats.snapshot()[f"GET {LOCATIONS}"]["retries"] == 2
+
+
+def test_returns_last_503_after_max_retries(fake):
+    fake.fail_next(LOCATIONS, 503, times=5)
+    client = AsyncAmadeusClient(base_url=fake.url, max_retries=2)
+
+    r = asyncio.run(client.get(LOCATIONS, token="t", params=PARAMS))
+
+    assert r.status_code == 503
+    assert fake.calls[LOCATIONS] == 3
+    assert client.stats.snapshot()[f"GET {LOCATIONS}"]["errors"] == 1
+
+
+def test_does_not_retry_client_errors(fake):
+    fake.fail_next(LOCATIONS, 400)
+    r = asyncio.run(AsyncAmadeusClient(base_url=fake.url, max_retries=3).get(LOCATIONS, token="t", params=PARAMS))
+    assert r.status_code == 400
+    assert fake.calls[LOCATIONS] == 1
+
+
+def test_honours_retry_after(fake):
+    fake.fail_next(LOCATIONS, 503, headers={"Retry-After": "0.4"})
+    client = AsyncAmadeusClient(base_url=fake.url, max_retries=1)
+
+    start = time.perf_counter()
+    r = asyncio.run(client.get(LOCATIONS, token="t", params=PARAMS))
+
+    assert r.status_code == 200
+    assert time.perf_counter() - start >= 0.4  # the base backoff alone is 0.01s
+
+
+def test_401_renews_token_once(fake, monkeypatch):
+    manager = _token_manager(fake)
+    monkeypatch.setattr(flights, "token_manager", manager)
+    monkeypatch.setattr(flights, "async_amadeus_client", manager.async_client)
+    fake.fail_next(LOCATIONS, 401)
+
+    r = asyncio.run(flights._amadeus_aget(LOCATIONS, PARAMS))
+
+    assert r.status_code == 200
+    assert fake.calls["token"] == 2
+    assert fake.authorizations[LOCATIONS] == ["Bearer fake-token-1", "Bearer fake-token-2"]
+
+
+def test_concurrent_aget_token_refreshes_once(fake):
+    fake.latency = 0.2
+    manager = _token_manager(fake)
+
+    async def run():
+        return await asyncio.gather(*(manager.aget_token() for _ in range(8)))
+
+    assert asyncio.run(run()) == ["fake-token-1"] * 8
+    assert fake.calls["token"] == 1
+    assert manager.stats()["misses"] == 1
+
+
+def test_event_loops_share_one_refresh(fake):
+    fake.latency = 0.2
+    manager = _token_manager(fake)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(asyncio.run(manager.aget_token()))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert tokens == ["fake-token-1"] * 4
+    assert fake.calls["token"] == 1
+
+
+def test_waiter_takes_over_cancelled_refresh(fake):
+    fake.latency = 0.2
+    manager = _token_manager(fake)
+
+    async def run():
+        leader = asyncio.create_task(manager.aget_token())
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(manager.aget_token())
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "fake-token-2"
+    assert fake.calls["token"] == 2
+
+
+def test_token_is_cached_until_invalidated(fake):
+    manager = _token_manager(fake)
+
+    async def run():
+        first = [await manager.aget_token(), await manager.aget_token()]
+        manager.invalidate()
+        return first + [await manager.aget_token()]
+
+    assert asyncio.run(run()) == ["fake-token-1", "fake-token-1", "fake-token-2"]
+    assert fake.calls["token"] == 2
+
+
+def test_one_pool_per_event_loop_closed_by_aclose(fake):
+    client = AsyncAmadeusClient(base_url=fake.url)
+
+    async def run():
+        await client.get(LOCATIONS, token="t", params=PARAMS)
+        pool = client._session()
+        await client.aclose()
+        return pool
+
+    pools = [asyncio.run(run()) for _ in range(3)]
+
+    assert all(pool.is_closed for pool in pools)
+    assert len({id(pool) for pool in pools}) == 3
+    assert client._clients == {}
@@ -0,0 +1,32 @@
+from render import render_plan_html
+
+STATE = {
+    "trip_details": '{"origin":"Delhi","destination":"Goa","days_of_stay":2}',
+    "flights": '{"offers":[{"airline":"6E","departure":"DEL","arrival":"GOI","dep_time":"06:10","arr_time":"08:45",'
+               '"duration_min":155,"stops":0,"price":5400.0,"currency":"INR"},'
+               '{"airline":"UK","departure":"DEL","arrival":"GOI","stops":1,"price":4100,"currency":"INR"}]}',
+    "activities": '{"days":[{"day":2,"morning":"Fort <tour>","afternoon":"Beach","evening":"Market","estimated_cost":1500},'
+                  '{"day":1,"morning":"Arrive","afternoon":"Rest","evening":"Dinner"}]}',
+    "trip_plan": "## Budget tips\n- Rent a scooter",
+}
+
+
+def test_template_tabulates_flights_and_activities():
+    page = render_plan_html(STATE)
+
+    flights = page[page.index("<h2>Flights</h2>"):page.index("<h2>Day by day</h2>")]
+    assert flights.index("INR 4,100") < flights.index("INR 5,400")  # cheapest first
+    assert "6E DEL 06:10 → GOI 08:45 (non-stop, 2h 35m)" in flights
+    assert "UK DEL → GOI (1 stop)" in flights
+
+    days = page[page.index("<h2>Day by day</h2>"):]
+    assert days.index("<td>1</td>") < days.index("<td>2</td>")
+    assert "Fort &lt;tour&gt;" in days and "1,500" in days
+    assert "<li>Rent a scooter</li>" in days  # the Markdown plan still follows
+
+
+def test_template_skips_unparseable_state():
+    page = render_plan_html({"flights": "no flights today", "activities": None, "trip_plan": ""})
+
+    assert "<h2>Flights</h2>" not in page and "<h2>Day by day</h2>" not in page
+    assert "No trip plan was generated." in page
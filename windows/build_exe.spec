@@ -3,7 +3,8 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('assets', 'assests')]
 binaries = []
-hiddenimports = []
+# app.py imports these by name on the first query, so the analysis cannot see them
+hiddenimports = ['agents', 'pipeline']
 tmp_ret = collect_all('google.adk')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('flet')